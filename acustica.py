@@ -0,0 +1,173 @@
+# --- ESTADÍSTICOS ACÚSTICOS (TAB 4) ---
+# Los niveles en dB no se promedian aritméticamente: Leq es el promedio
+# energético 10·log10(mean(10^(L/10))) y L10/L50/L90 son los niveles
+# excedidos el 10/50/90 % del tiempo. Todo sale de agregados parciales
+# mezclables por (nodo, hora): suma de energía, conteo, mínimo, máximo e
+# histograma de niveles a 0.1 dB. Los parciales de un archivo se cachean, y
+# los de cualquier ventana se combinan sin volver a recorrer las lecturas.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from cache_lru import espacio_cache
+
+# Histograma de niveles: 0–140 dB en pasos de 0.1 dB
+RESOLUCION_DB = 0.1
+NIVEL_MAX_DB = 140.0
+N_BINS = int(round(NIVEL_MAX_DB / RESOLUCION_DB)) + 1
+
+# (columna, fracción del tiempo por debajo del nivel)
+PERCENTILES = (("L10", 0.90), ("L50", 0.50), ("L90", 0.10))
+
+_cache_parciales = espacio_cache("parciales")
+
+
+def leq(niveles):
+    """Nivel equivalente (promedio energético) de un arreglo de dB."""
+    niveles = np.asarray(niveles, dtype=np.float64)
+    return 10.0 * np.log10(np.mean(np.power(10.0, niveles / 10.0)))
+
+
+@dataclass
+class ParcialesAcusticos:
+    claves: pd.DataFrame  # nodo (categoría) y hora (inicio, hora local)
+    energia: np.ndarray
+    conteo: np.ndarray
+    minimo: np.ndarray
+    maximo: np.ndarray
+    histograma: np.ndarray  # (grupos, N_BINS)
+
+    @classmethod
+    def desde_lecturas(cls, df):
+        """Parciales por (nodo, hora) en una sola pasada agrupada."""
+        nodos = df["nodo"].astype("category")
+        valores = df["_value"].to_numpy(dtype=np.float64)
+        horas = df["_time"].dt.floor("h")
+        grupos = pd.DataFrame({"nodo": nodos.cat.codes.to_numpy(), "hora": horas.array.asi8})
+        ids, unicos = pd.factorize(pd.MultiIndex.from_frame(grupos), sort=True)
+        n = len(unicos)
+
+        bins = np.clip(np.rint(valores / RESOLUCION_DB), 0, N_BINS - 1).astype(np.int64)
+        histograma = np.bincount(ids * N_BINS + bins, minlength=n * N_BINS)
+        minimo = np.full(n, np.inf)
+        maximo = np.full(n, -np.inf)
+        np.minimum.at(minimo, ids, valores)
+        np.maximum.at(maximo, ids, valores)
+
+        return cls(
+            claves=pd.DataFrame({
+                "nodo": pd.Categorical.from_codes(unicos.get_level_values(0), categories=nodos.cat.categories),
+                "hora": pd.to_datetime(unicos.get_level_values(1), utc=True).tz_convert(horas.dt.tz),
+            }),
+            energia=np.bincount(ids, weights=np.power(10.0, valores / 10.0), minlength=n),
+            conteo=np.bincount(ids, minlength=n),
+            minimo=minimo,
+            maximo=maximo,
+            histograma=histograma.reshape(n, N_BINS).astype(np.int32),
+        )
+
+    def __len__(self):
+        return len(self.claves)
+
+    @property
+    def nbytes(self):
+        return int(self.histograma.nbytes + self.energia.nbytes * 4)
+
+    def filtrar(self, mascara):
+        mascara = np.asarray(mascara)
+        return ParcialesAcusticos(
+            claves=self.claves[mascara].reset_index(drop=True),
+            energia=self.energia[mascara], conteo=self.conteo[mascara],
+            minimo=self.minimo[mascara], maximo=self.maximo[mascara],
+            histograma=self.histograma[mascara],
+        )
+
+    @staticmethod
+    def concatenar(partes):
+        partes = [p for p in partes if len(p)]
+        if len(partes) == 1:
+            return partes[0]
+        claves = pd.concat([p.claves for p in partes], ignore_index=True)
+        claves["nodo"] = union_categoricals([p.claves["nodo"] for p in partes])
+        return ParcialesAcusticos(
+            claves=claves,
+            energia=np.concatenate([p.energia for p in partes]),
+            conteo=np.concatenate([p.conteo for p in partes]),
+            minimo=np.concatenate([p.minimo for p in partes]),
+            maximo=np.concatenate([p.maximo for p in partes]),
+            histograma=np.vstack([p.histograma for p in partes]),
+        )
+
+    def combinar(self, por):
+        """Mezcla los parciales que comparten las columnas `por` (p. ej. ["nodo"])."""
+        grupos = self.claves.groupby(por, sort=True, observed=True)
+        ids = grupos.ngroup().to_numpy()
+        n = grupos.ngroups
+        minimo = np.full(n, np.inf)
+        maximo = np.full(n, -np.inf)
+        np.minimum.at(minimo, ids, self.minimo)
+        np.maximum.at(maximo, ids, self.maximo)
+        histograma = np.zeros((n, N_BINS), dtype=np.int64)
+        np.add.at(histograma, ids, self.histograma)
+        return ParcialesAcusticos(
+            claves=grupos.size().index.to_frame(index=False),
+            energia=np.bincount(ids, weights=self.energia, minlength=n),
+            conteo=np.bincount(ids, weights=self.conteo, minlength=n).astype(np.int64),
+            minimo=minimo,
+            maximo=maximo,
+            histograma=histograma,
+        )
+
+    def estadisticos(self):
+        """Leq, Lmax, Lmin, L10, L50, L90 y conteo de cada grupo."""
+        conteo = self.conteo.astype(np.float64)
+        tabla = self.claves.copy()
+        tabla["Leq"] = 10.0 * np.log10(self.energia / conteo)
+        tabla["Lmax"] = self.maximo
+        tabla["Lmin"] = self.minimo
+        acumulado = np.cumsum(self.histograma, axis=1)
+        for nombre, fraccion in PERCENTILES:
+            objetivo = np.ceil(fraccion * conteo)[:, None]
+            # El centro del intervalo puede quedar fuera de lo medido: se acota a [Lmin, Lmax]
+            nivel = np.argmax(acumulado >= objetivo, axis=1) * RESOLUCION_DB
+            tabla[nombre] = np.clip(nivel, self.minimo, self.maximo)
+        tabla["Conteo"] = self.conteo.astype(np.int64)
+        return tabla
+
+
+def parciales_para(df, clave=None):
+    """Parciales por (nodo, hora) de `df`, cacheados entre sesiones si hay `clave`."""
+    if clave is None:
+        return ParcialesAcusticos.desde_lecturas(df)
+    return _cache_parciales.obtener_o_calcular(
+        ("parciales", clave), lambda: ParcialesAcusticos.desde_lecturas(df)
+    )
+
+
+def parciales_ventana(df_filtrado, parciales_base=None):
+    """Parciales de la selección reutilizando las horas completas ya cacheadas.
+
+    Las horas que la selección cubre completas se toman de `parciales_base`;
+    solo las lecturas de las horas de los extremos se vuelven a agregar.
+    """
+    if parciales_base is None or df_filtrado.empty:
+        return ParcialesAcusticos.desde_lecturas(df_filtrado)
+
+    inicio, fin = df_filtrado["_time"].min(), df_filtrado["_time"].max()
+    primera_completa = inicio.ceil("h")
+    ultima_completa = fin.floor("h") - pd.Timedelta(hours=1)
+    nodos = df_filtrado["nodo"].astype(str).unique()
+
+    horas = parciales_base.claves["hora"]
+    completas = parciales_base.filtrar(
+        (horas >= primera_completa) & (horas <= ultima_completa)
+        & parciales_base.claves["nodo"].astype(str).isin(nodos)
+    )
+    en_bordes = (df_filtrado["_time"] < primera_completa) | (
+        df_filtrado["_time"] >= ultima_completa + pd.Timedelta(hours=1)
+    )
+    bordes = ParcialesAcusticos.desde_lecturas(df_filtrado[en_bordes])
+    return ParcialesAcusticos.concatenar([completas, bordes])
@@ -0,0 +1,115 @@
+# --- PIRÁMIDE DE AGREGADOS (TABS 2 Y 3) ---
+# Al cargar los datos se precalculan, por nodo, mínimo/máximo/media/Leq a
+# 1 min, 5 min, 15 min y 1 h. El nivel de 1 min sale de las lecturas crudas y
+# cada nivel más grueso se combina a partir del anterior (sumas, conteos,
+# energía, mín. y máx. son mezclables). Las gráficas piden el nivel más
+# grueso que aún da al menos un punto por píxel y dibujan la envolvente
+# mín./máx., así que los picos no se pierden y la carga que se envía al
+# navegador no crece con el rango de fechas.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from cache_lru import espacio_cache
+from carga_datos import ZONA_HORARIA
+
+NIVELES_S = (60, 300, 900, 3600)
+
+_cache_piramides = espacio_cache("piramides")
+
+_AGREGACION_CRUDA = dict(
+    minimo=("v", "min"), maximo=("v", "max"), suma=("v", "sum"),
+    energia=("e", "sum"), conteo=("v", "size"),
+)
+_AGREGACION_NIVEL = dict(
+    minimo=("minimo", "min"), maximo=("maximo", "max"), suma=("suma", "sum"),
+    energia=("energia", "sum"), conteo=("conteo", "sum"),
+)
+
+
+def _agrupar(tabla, paso_s, agregacion):
+    paso_ns = paso_s * 1_000_000_000
+    tabla = tabla.assign(t=(tabla["t"] // paso_ns) * paso_ns)
+    nivel = tabla.groupby(["nodo", "t"], sort=True).agg(**agregacion).reset_index()
+    return nivel.astype({"minimo": np.float32, "maximo": np.float32, "conteo": np.int32})
+
+
+@dataclass
+class PiramideAgregados:
+    niveles: dict  # paso_s -> DataFrame(nodo, t, minimo, maximo, suma, energia, conteo)
+    categorias: list
+
+    @classmethod
+    def desde_lecturas(cls, df):
+        nodos = df["nodo"].astype("category")
+        valores = df["_value"].to_numpy(dtype=np.float64)
+        tabla = pd.DataFrame({
+            "nodo": nodos.cat.codes.to_numpy(),
+            "t": df["_time"].dt.tz_convert("UTC").dt.as_unit("ns").array.asi8,
+            "v": valores,
+            "e": np.power(10.0, valores / 10.0),
+        })
+        niveles, anterior = {}, None
+        for paso_s in NIVELES_S:
+            if anterior is None:
+                anterior = _agrupar(tabla, paso_s, _AGREGACION_CRUDA)
+            else:
+                anterior = _agrupar(anterior, paso_s, _AGREGACION_NIVEL)
+            niveles[paso_s] = anterior
+        return cls(niveles=niveles, categorias=list(nodos.cat.categories))
+
+    def nivel_para(self, inicio, fin, ancho_px):
+        """Paso (s) más grueso con al menos un punto por píxel; None = crudo."""
+        segundos = (fin - inicio).total_seconds()
+        elegido = None
+        for paso_s in NIVELES_S:
+            if segundos / paso_s >= ancho_px:
+                elegido = paso_s
+        return elegido
+
+    def consultar(self, inicio, fin, nodos, ancho_px, seleccion):
+        """(paso_s, DataFrame con _time, nodo, minimo, media, maximo, leq).
+
+        `seleccion` son las lecturas ya recortadas a la ventana y los nodos
+        (ver indice_lecturas.py); solo se usan si la ventana es tan corta que
+        se dibuja el nivel crudo, así que la pirámide no guarda el DataFrame.
+        """
+        paso_s = self.nivel_para(inicio, fin, ancho_px)
+        nodos = [str(n) for n in nodos]
+        if paso_s is None:
+            sel = seleccion
+            return None, pd.DataFrame({
+                "_time": sel["_time"], "nodo": sel["nodo"],
+                "minimo": sel["_value"], "media": sel["_value"],
+                "maximo": sel["_value"], "leq": sel["_value"],
+            })
+
+        nivel = self.niveles[paso_s]
+        codigos = [self.categorias.index(n) for n in nodos if n in self.categorias]
+        t_ini = inicio.tz_convert("UTC").as_unit("ns").value
+        t_fin = fin.tz_convert("UTC").as_unit("ns").value
+        # Incluye el intervalo que empieza antes de `inicio` pero lo contiene
+        sel = nivel[(nivel["t"] > t_ini - paso_s * 1_000_000_000) & (nivel["t"] <= t_fin) & nivel["nodo"].isin(codigos)]
+        return paso_s, pd.DataFrame({
+            "_time": pd.to_datetime(sel["t"].to_numpy(), utc=True).tz_convert(ZONA_HORARIA),
+            "nodo": pd.Categorical.from_codes(sel["nodo"].to_numpy(), categories=self.categorias),
+            "minimo": sel["minimo"].to_numpy(dtype=np.float32),
+            "media": (sel["suma"] / sel["conteo"]).to_numpy(dtype=np.float32),
+            "maximo": sel["maximo"].to_numpy(dtype=np.float32),
+            "leq": (10.0 * np.log10(sel["energia"] / sel["conteo"])).to_numpy(dtype=np.float32),
+        })
+
+    @property
+    def nbytes(self):
+        return sum(int(n.memory_usage(index=True).sum()) for n in self.niveles.values())
+
+
+def piramide_para(df, clave=None):
+    """Pirámide de `df`; si se da `clave` (versión del archivo) se cachea entre sesiones."""
+    if clave is None:
+        return PiramideAgregados.desde_lecturas(df)
+    return _cache_piramides.obtener_o_calcular(
+        ("piramide", clave), lambda: PiramideAgregados.desde_lecturas(df)
+    )
@@ -0,0 +1,203 @@
+# --- ALMACÉN COLUMNAR (PARQUET) PARTICIONADO POR FECHA Y NODO ---
+# Convierte las exportaciones CSV (estilo 40nodos.csv) en un dataset Parquet
+# con particiones tipo Hive: fecha=AAAA-MM-DD[/nodo=N]. La fecha es la local
+# de México, la misma que se elige en el sidebar, así que una consulta solo
+# abre los archivos de los días (y nodos) seleccionados, lee solo las tres
+# columnas útiles y lo hace con lecturas mapeadas en memoria.
+#
+# Uso:  python almacen_columnar.py 40nodos.csv [--destino datos_parquet] [--por-nodo]
+
+import argparse
+import json
+import os
+import re
+
+import pandas as pd
+
+from carga_datos import ZONA_HORARIA, leer_csv_crudo, normalizar
+
+ALMACEN_DEFAULT = os.environ.get("RUIDO_ALMACEN", "datos_parquet")
+_META = "_almacen.json"
+
+
+def _leer_meta(destino):
+    ruta = os.path.join(destino, _META)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _escribir_meta(destino, meta):
+    with open(os.path.join(destino, _META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _orden_nodos(nodos):
+    try:
+        return sorted(nodos, key=int)
+    except ValueError:
+        return sorted(nodos)
+
+
+def _retirar_repetidas(destino, tabla, por_nodo, base):
+    """Quita de los fragmentos ya escritos las lecturas (nodo, _time) que trae `tabla`.
+
+    Solo se abren las particiones que toca la exportación nueva. Los
+    fragmentos de una ingesta anterior del mismo archivo se borran completos.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    propio = re.compile(rf"{re.escape(base)}-\d+\.parquet")
+    niveles = ["fecha", "nodo"] if por_nodo else ["fecha"]
+    # Con partición por nodo, los fragmentos ya no guardan la columna `nodo`
+    llaves = ["_time"] if por_nodo else ["nodo", "_time"]
+    for particion, nuevas in tabla.groupby(niveles, sort=False):
+        particion = particion if isinstance(particion, tuple) else (particion,)
+        directorio = os.path.join(destino, *(f"{n}={v}" for n, v in zip(niveles, particion)))
+        if not os.path.isdir(directorio):
+            continue
+        presentes = pd.MultiIndex.from_frame(nuevas[llaves])
+        for nombre in os.listdir(directorio):
+            ruta = os.path.join(directorio, nombre)
+            if not nombre.endswith(".parquet"):
+                continue
+            if propio.fullmatch(nombre):
+                os.remove(ruta)
+                continue
+            existentes = pq.read_table(ruta).to_pandas()
+            repetidas = pd.MultiIndex.from_frame(existentes[llaves]).isin(presentes)
+            if repetidas.all():
+                os.remove(ruta)
+            elif repetidas.any():
+                pq.write_table(pa.Table.from_pandas(existentes[~repetidas], preserve_index=False), ruta)
+
+
+def ingerir_csv(ruta_csv, destino=ALMACEN_DEFAULT, por_nodo=False):
+    """Agrega una exportación CSV al almacén. Devuelve el número de filas escritas.
+
+    Volver a ingerir el mismo archivo sobrescribe sus fragmentos, no los duplica.
+    Si la exportación se traslapa con otras ya ingeridas, ante (nodo, _time)
+    repetido gana la última, como en `carga_datos.unir`.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    meta = _leer_meta(destino) or {"por_nodo": por_nodo, "nodos": []}
+    if meta["por_nodo"] != por_nodo:
+        raise ValueError(
+            f"El almacén '{destino}' ya existe con por_nodo={meta['por_nodo']}."
+        )
+
+    df = normalizar(leer_csv_crudo(ruta_csv))
+    tabla = pd.DataFrame({
+        "_time": df["_time"].dt.tz_convert("UTC"),
+        "nodo": df["nodo"].astype(str),
+        "_value": df["_value"],
+        "fecha": df["_time"].dt.strftime("%Y-%m-%d"),
+    }).sort_values(["nodo", "_time"], kind="stable")
+
+    campos = [("fecha", pa.string())] + ([("nodo", pa.string())] if por_nodo else [])
+    os.makedirs(destino, exist_ok=True)
+    base = os.path.splitext(os.path.basename(ruta_csv))[0]
+    _retirar_repetidas(destino, tabla, por_nodo, base)
+    ds.write_dataset(
+        pa.Table.from_pandas(tabla, preserve_index=False),
+        destino,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema(campos), flavor="hive"),
+        basename_template=f"{base}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+    meta["nodos"] = _orden_nodos(set(meta["nodos"]) | set(tabla["nodo"].unique()))
+    _escribir_meta(destino, meta)
+    return len(tabla)
+
+
+def fechas_disponibles(destino=ALMACEN_DEFAULT):
+    """Fechas (datetime.date) con partición en el almacén, sin abrir archivos."""
+    if not os.path.isdir(destino):
+        return []
+    return sorted(
+        pd.Timestamp(nombre.split("=", 1)[1]).date()
+        for nombre in os.listdir(destino)
+        if nombre.startswith("fecha=")
+    )
+
+
+def version_almacen(destino=ALMACEN_DEFAULT):
+    """Cambia cada vez que se ingiere algo al almacén (None si no existe)."""
+    ruta = os.path.join(destino, _META)
+    if not os.path.exists(ruta):
+        return None
+    return (os.path.abspath(destino), os.stat(ruta).st_mtime_ns)
+
+
+def nodos_disponibles(destino=ALMACEN_DEFAULT):
+    meta = _leer_meta(destino)
+    return meta["nodos"] if meta else []
+
+
+def leer_almacen(inicio, fin, nodos, destino=ALMACEN_DEFAULT):
+    """Lecturas entre `inicio` y `fin` (tz-aware) para `nodos`, ya normalizadas."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    meta = _leer_meta(destino)
+    if meta is None:
+        raise FileNotFoundError(f"No existe el almacén columnar '{destino}'.")
+
+    fechas = pd.date_range(
+        inicio.tz_convert(ZONA_HORARIA).normalize().tz_localize(None),
+        fin.tz_convert(ZONA_HORARIA).normalize().tz_localize(None),
+        freq="D",
+    ).strftime("%Y-%m-%d").tolist()
+
+    # Poda de particiones: solo se listan los directorios seleccionados
+    directorios = [os.path.join(destino, f"fecha={f}") for f in fechas]
+    if meta["por_nodo"]:
+        directorios = [os.path.join(d, f"nodo={n}") for d in directorios for n in nodos]
+    archivos = [
+        os.path.join(d, nombre)
+        for d in directorios if os.path.isdir(d)
+        for nombre in sorted(os.listdir(d)) if nombre.endswith(".parquet")
+    ]
+    if not archivos:
+        return pd.DataFrame()
+
+    campos = [("fecha", pa.string())] + ([("nodo", pa.string())] if meta["por_nodo"] else [])
+    dataset = ds.dataset(
+        archivos,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema(campos), flavor="hive"),
+        partition_base_dir=destino,
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+    filtro = (
+        ds.field("nodo").isin([str(n) for n in nodos])
+        & (ds.field("_time") >= pa.scalar(inicio.tz_convert("UTC"), pa.timestamp("ns", "UTC")))
+        & (ds.field("_time") <= pa.scalar(fin.tz_convert("UTC"), pa.timestamp("ns", "UTC")))
+    )
+    tabla = dataset.to_table(columns=["_time", "nodo", "_value"], filter=filtro)
+    if tabla.num_rows == 0:
+        return pd.DataFrame()
+    return normalizar(tabla.to_pandas())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingesta de CSV de InfluxDB al almacén Parquet.")
+    parser.add_argument("archivos", nargs="+", help="Exportaciones CSV a ingerir")
+    parser.add_argument("--destino", default=ALMACEN_DEFAULT)
+    parser.add_argument("--por-nodo", action="store_true", help="Particionar también por nodo")
+    args = parser.parse_args(argv)
+    for ruta in args.archivos:
+        filas = ingerir_csv(ruta, args.destino, por_nodo=args.por_nodo)
+        print(f"{ruta}: {filas} filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,30 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sb
-from scipy.interpolate import griddata
+from streamlit_autorefresh import st_autorefresh
 import os # Importar os para manejo de rutas de archivos
 
+from almacen_columnar import ALMACEN_DEFAULT, fechas_disponibles, leer_almacen, version_almacen
+from almacen_columnar import nodos_disponibles as nodos_disponibles_almacen
+from cache_artefactos import clave_seleccion, obtener_artefacto
+from calidad_datos import RANGO_DB_VALIDO, calidad_para, evaluar_calidad
+from carga_datos import ZONA_HORARIA, ErrorDatos, cargar_resultados, resolver_archivos
+from clasificacion import CRITERIOS_RIESGO, RANGOS_DB, distribucion_horaria
+from fuente_influx import ConfigInflux, consultar_nodos, consultar_resultados, version_influx
+from indice_lecturas import indice_para
+from mapa_calor import RESOLUCION_DEFAULT, construir_matriz, dibujar_matriz
+from mapa_espacial import RUTA_COORDENADAS, cargar_coordenadas, dibujar_mapa, niveles_promedio, operador_para
+from perfilado import Perfilador, iniciar_servidor_metricas, percentiles, texto_prometheus
+from pipeline_resultados import (
+    calcular_estadisticos, calcular_series, pivote_maximos, riesgo_por_nodo, tabla_exposicion, ventana_local
+)
+from tiempo_real import monitor_csv, monitor_influx
+
 st.set_page_config(page_title="Visualización de Niveles de Sonido", layout="wide")
 
+# Gráficas por nodo que se muestran a la vez en "Gráficos por nodo"
+NODOS_POR_PAGINA = 8
+
 # --- ESTILO PERSONALIZADO ---
 st.markdown("""
 <style>
@@ -265,231 +283,342 @@ elif seccion_activa == "Desarrollo":
 elif seccion_activa == "Resultados":
     st.markdown("### Resultados")
 
-    # Ruta fija al archivo CSV
-    uploaded_file = "consultaprueba2.csv"
+    # Temporizadores por etapa de este rerun
+    perfil = Perfilador()
+    iniciar_servidor_metricas()
+
+    # Archivo CSV, directorio o patrón glob con las exportaciones de InfluxDB
+    uploaded_file = os.environ.get("RUIDO_DATOS", "consultaprueba2.csv")
 
     # Inicializar df_filtrado como DataFrame vacío para el scope general
     df_filtrado = pd.DataFrame()
+    # DataFrame cargado completo y su versión, cuando la fuente es el archivo CSV
+    df, clave_datos = None, None
+    # Huecos, duplicados y valores fuera de rango (del archivo completo o de la selección)
+    calidad = None
+    # Versión de los datos para la caché de artefactos (None en modo en vivo)
+    version_datos = None
+
+    with st.sidebar:
+        st.header("Parámetros de entrada")
+        fuente_datos = st.radio("Fuente de datos", ["Archivo CSV", "Almacén Parquet", "InfluxDB"], horizontal=True)
+        criterio_riesgo = st.selectbox("Criterio de riesgo", options=list(CRITERIOS_RIESGO))
+        en_vivo = st.checkbox("Monitoreo en vivo", value=False)
+        if en_vivo:
+            intervalo_s = st.select_slider("Actualizar cada (s)", options=[5, 10, 30, 60], value=5)
+        mostrar_rendimiento = st.checkbox("Mostrar panel de rendimiento", value=False)
+
+    if en_vivo:
+        st_autorefresh(interval=intervalo_s * 1000, key="refresco_en_vivo")
 
     try:
-        # Verificar si el archivo existe
-        if not os.path.exists(uploaded_file):
-            st.error(f"El archivo de datos '{uploaded_file}' no fue encontrado.")
-        else:
-            def clean_cols(cols):
-                return [str(c).strip().replace('\ufeff', '') for c in cols]
-
-            df_try = pd.read_csv(uploaded_file, dtype=str)
-            df_try.columns = clean_cols(df_try.columns)
-            
-            columnas_requeridas = ['_time', 'nodo', '_value']
-            if not all(any(req == c.lower() for c in df_try.columns) for req in columnas_requeridas):
-                df_try = pd.read_csv(uploaded_file, skiprows=3)
-                df_try.columns = clean_cols(df_try.columns)
-            
-            cols_lower = {c.lower().strip().replace('\ufeff',''): c for c in df_try.columns}
-            mapping = {}
-            if '_time' in cols_lower: mapping[cols_lower['_time']] = '_time'
-            if 'time' in cols_lower and '_time' not in cols_lower: mapping[cols_lower['time']] = '_time'
-            if '_value' in cols_lower: mapping[cols_lower['_value']] = '_value'
-            elif 'value' in cols_lower: mapping[cols_lower['value']] = '_value'
-            if 'nodo' in cols_lower: mapping[cols_lower['nodo']] = 'nodo'
-            elif 'node' in cols_lower: mapping[cols_lower['node']] = 'nodo'
-
-            df = df_try.rename(columns=mapping)
-
-            if not all(col in df.columns for col in columnas_requeridas):
-                st.error("El archivo no contiene las columnas necesarias (_time, nodo, _value).")
+        if en_vivo:
+            # --- MONITOREO EN VIVO: SOLO SE LEEN LAS FILAS NUEVAS EN CADA TICK ---
+            if fuente_datos == "InfluxDB":
+                monitor = monitor_influx(ConfigInflux.desde_entorno())
+            elif fuente_datos == "Almacén Parquet":
+                raise ValueError("El monitoreo en vivo solo está disponible para el archivo CSV o InfluxDB.")
+            elif not resolver_archivos(uploaded_file):
+                raise FileNotFoundError(f"El archivo de datos '{uploaded_file}' no fue encontrado.")
             else:
-                df['_value'] = pd.to_numeric(df['_value'], errors='coerce')
-                df = df.dropna(subset=['_time', '_value', 'nodo']).copy()
-
-                # --- CORRECCIÓN COMPLETA DE ZONA HORARIA ---
-                df['_time'] = pd.to_datetime(df['_time'], errors='coerce')
+                # Con varias exportaciones, se sigue la más reciente
+                monitor = monitor_csv(max(resolver_archivos(uploaded_file), key=os.path.getmtime))
+            with perfil.etapa("carga") as etapa:
+                etapa.filas = monitor.actualizar()
+
+            with st.sidebar:
+                nodos_disponibles = monitor.buffer.lista_nodos()
+                nodos_seleccionados = st.multiselect(
+                    "Selecciona los nodos:",
+                    options=nodos_disponibles,
+                    default=nodos_disponibles
+                )
 
-                # Si viene sin tz, asumir UTC
-                if df['_time'].dt.tz is None:
-                    df['_time'] = df['_time'].dt.tz_localize('UTC', ambiguous='NaT', nonexistent='shift_forward')
-                else:
-                    try:
-                        df['_time'] = df['_time'].dt.tz_convert('UTC')
-                    except:
-                        pass
+            with perfil.etapa("filtro") as etapa:
+                df_filtrado = monitor.dataframe(nodos_seleccionados)
+                etapa.filas = len(df_filtrado)
+            if not df_filtrado.empty:
+                fecha = df_filtrado['_time'].max().date()
+                fecha_inicio, fecha_fin = df_filtrado['_time'].min(), df_filtrado['_time'].max()
+                st.caption(f"En vivo · última lectura: {df_filtrado['_time'].max():%Y-%m-%d %H:%M:%S}")
+
+        elif fuente_datos == "InfluxDB":
+            # --- CONSULTA DIRECTA, SUBMUESTREADA EN EL SERVIDOR ---
+            config_influx = ConfigInflux.desde_entorno()
+
+            with st.sidebar:
+                fecha = st.date_input("Fecha", value=pd.Timestamp.now(tz=ZONA_HORARIA).date())
+
+                hora_inicio = st.time_input("Hora de inicio", value=pd.to_datetime('00:00').time())
+                hora_fin = st.time_input("Hora de fin", value=pd.to_datetime('23:59').time())
+
+                nodos_disponibles = consultar_nodos(config_influx)
+                nodos_seleccionados = st.multiselect(
+                    "Selecciona los nodos:",
+                    options=nodos_disponibles,
+                    default=nodos_disponibles
+                )
 
-                # Convertir a México UNA SOLA VEZ
-                df['_time'] = df['_time'].dt.tz_convert('America/Mexico_City')
+            fecha_inicio, fecha_fin = ventana_local(fecha, hora_inicio, hora_fin)
+            version_datos = version_influx(config_influx, fecha_fin)
+
+            if nodos_seleccionados:
+                with perfil.etapa("carga") as etapa:
+                    df_filtrado = consultar_resultados(
+                        config_influx, fecha_inicio, fecha_fin, nodos_seleccionados
+                    ).copy(deep=False)
+                    etapa.filas = len(df_filtrado)
+
+        elif fuente_datos == "Almacén Parquet":
+            # --- SOLO SE LEEN LAS PARTICIONES Y COLUMNAS DE LA SELECCIÓN ---
+            fechas_almacen = fechas_disponibles()
+            if not fechas_almacen:
+                st.error(f"El almacén '{ALMACEN_DEFAULT}' está vacío. Ingiera los CSV con almacen_columnar.py.")
+            else:
+                with st.sidebar:
+                    fecha = st.date_input("Fecha", value=fechas_almacen[0], min_value=fechas_almacen[0], max_value=fechas_almacen[-1])
 
-                if df['_time'].isna().all():
-                    st.error("No se pudieron interpretar las fechas en la columna '_time'.")
-                else:
-                    # --- SIDEBAR DE FILTROS ---
-                    with st.sidebar:
-                        st.header("Parámetros de entrada")
+                    hora_inicio = st.time_input("Hora de inicio", value=pd.to_datetime('00:00').time())
+                    hora_fin = st.time_input("Hora de fin", value=pd.to_datetime('23:59').time())
 
-                        tiempo_min = df['_time'].min()
-                        tiempo_max = df['_time'].max()
+                    nodos_disponibles = nodos_disponibles_almacen()
+                    nodos_seleccionados = st.multiselect(
+                        "Selecciona los nodos:",
+                        options=nodos_disponibles,
+                        default=nodos_disponibles
+                    )
 
-                        fecha_default = tiempo_min.date()
-                        fecha = st.date_input("Fecha", value=fecha_default, min_value=tiempo_min.date(), max_value=tiempo_max.date())
+                fecha_inicio, fecha_fin = ventana_local(fecha, hora_inicio, hora_fin)
 
-                        hora_inicio = st.time_input("Hora de inicio", value=pd.to_datetime('00:00').time())
-                        hora_fin = st.time_input("Hora de fin", value=pd.to_datetime('23:59').time())
+                version_datos = version_almacen()
+                with perfil.etapa("carga") as etapa:
+                    df_filtrado = leer_almacen(fecha_inicio, fecha_fin, nodos_seleccionados)
+                    etapa.filas = len(df_filtrado)
 
-                        nodos_disponibles = sorted(df["nodo"].astype(str).unique())
-                        nodos_seleccionados = st.multiselect(
-                            "Selecciona los nodos:",
-                            options=nodos_disponibles,
-                            default=nodos_disponibles
-                        )
+        # Verificar si el archivo existe
+        elif not resolver_archivos(uploaded_file):
+            st.error(f"El archivo de datos '{uploaded_file}' no fue encontrado.")
+        else:
+            with perfil.etapa("carga") as etapa:
+                df, clave_datos = cargar_resultados(uploaded_file)
+                indice = indice_para(df, clave_datos)
+                version_datos = clave_datos
+                etapa.filas = len(df)
+            with perfil.etapa("calidad", filas=len(df)):
+                calidad = calidad_para(df, clave_datos)
+
+            # --- SIDEBAR DE FILTROS ---
+            with st.sidebar:
+                fecha = st.date_input("Fecha", value=indice.fecha_min, min_value=indice.fecha_min, max_value=indice.fecha_max)
+
+                hora_inicio = st.time_input("Hora de inicio", value=pd.to_datetime('00:00').time())
+                hora_fin = st.time_input("Hora de fin", value=pd.to_datetime('23:59').time())
+
+                nodos_disponibles = indice.nodos
+                nodos_seleccionados = st.multiselect(
+                    "Selecciona los nodos:",
+                    options=nodos_disponibles,
+                    default=nodos_disponibles
+                )
 
-                        # --- FILTRADO AHORA 100% EN MÉXICO ---
-                        fecha_inicio = pd.to_datetime(f"{fecha} {hora_inicio}").tz_localize('America/Mexico_City')
-                        fecha_fin = pd.to_datetime(f"{fecha} {hora_fin}").tz_localize('America/Mexico_City')
+                # --- FILTRADO AHORA 100% EN MÉXICO ---
+                fecha_inicio, fecha_fin = ventana_local(fecha, hora_inicio, hora_fin)
 
-                        df_filtrado = df[
-                            (df['_time'] >= fecha_inicio) &
-                            (df['_time'] <= fecha_fin) &
-                            (df['nodo'].astype(str).isin(nodos_seleccionados))
-                        ].copy()
-                    # --- FIN SIDEBAR ---
+                # Búsqueda binaria por nodo sobre los datos ordenados por (nodo, _time)
+                with perfil.etapa("filtro") as etapa:
+                    df_filtrado = indice.ventana(df, fecha_inicio, fecha_fin, nodos_seleccionados)
+                    etapa.filas = len(df_filtrado)
+            # --- FIN SIDEBAR ---
+    except ErrorDatos as e:
+        st.error(str(e))
     except Exception as e:
         st.error(f"Error al cargar o procesar el archivo: {e}")
 
     if not df_filtrado.empty:
 
-        # Clasificación riesgo auditivo
-        def clasificar_riesgo(db):
-            if db < 85: return "Seguro"
-            elif db < 100: return "Riesgo moderado"
-            else: return "Peligroso"
-
-        df_filtrado["riesgo"] = df_filtrado["_value"].apply(clasificar_riesgo)
-        df_filtrado["hora"] = df_filtrado["_time"].dt.hour
+        # Los artefactos numéricos se comparten entre sesiones con la misma selección
+        seleccion = None
+        if version_datos is not None:
+            seleccion = clave_seleccion(version_datos, fecha_inicio, fecha_fin, nodos_seleccionados)
 
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "📊 Mapa de Sonido", 
-            "📈 Gráficos por nodo", 
-            "🧩 Comparación general", 
-            "📊 Análisis estadístico", 
+        # --- CALIDAD Y DISPONIBILIDAD DE LOS DATOS ---
+        if calidad is None:
+            with perfil.etapa("calidad", filas=len(df_filtrado)):
+                calidad = obtener_artefacto(seleccion, "calidad", lambda: evaluar_calidad(df_filtrado))
+            calidad_ventana = calidad
+        else:
+            # Huecos y disponibilidad salen del archivo completo (un hueco puede
+            # empezar antes de la ventana); los demás indicadores, de la selección
+            with perfil.etapa("calidad_ventana", filas=len(df_filtrado)):
+                calidad_ventana = obtener_artefacto(seleccion, "calidad_ventana", lambda: evaluar_calidad(df_filtrado))
+        nodos_calidad = list(df_filtrado["nodo"].astype(str).unique())
+        huecos_ventana = calidad.huecos_en(fecha_inicio, fecha_fin, nodos_calidad)
+        with st.expander(f"Calidad de datos · {len(huecos_ventana)} huecos en la ventana"):
+            resumen_calidad = calidad_ventana.resumen.loc[nodos_calidad]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Filas descartadas al cargar", calidad.descartadas)
+            col2.metric("Marcas de tiempo repetidas", int(resumen_calidad["Duplicados"].sum()))
+            col3.metric(f"Fuera de {RANGO_DB_VALIDO[0]:.0f}–{RANGO_DB_VALIDO[1]:.0f} dB", int(resumen_calidad["Fuera de rango"].sum()))
+            st.dataframe(pd.concat(
+                [calidad.disponibilidad(fecha_inicio, fecha_fin, nodos_calidad), resumen_calidad], axis=1
+            ))
+            if len(huecos_ventana):
+                st.markdown("#### Huecos en la ventana")
+                st.dataframe(huecos_ventana, hide_index=True)
+
+        # Solo se calcula la vista seleccionada (st.tabs ejecutaría las cinco)
+        vistas = [
+            "📊 Mapa de Sonido",
+            "📈 Gráficos por nodo",
+            "🧩 Comparación general",
+            "📊 Análisis estadístico",
             "🧨 Riesgo por hora"
-        ])
+        ]
+        vista = st.radio("Vista", vistas, horizontal=True, label_visibility="collapsed", key="vista_resultados")
 
         # :::::::::::::::::::::::::::::::::::::::::::::::::::
         #                   TAB 1: HEATMAP
         # :::::::::::::::::::::::::::::::::::::::::::::::::::
-        with tab1:
+        if vista == vistas[0]:
             st.markdown("### Mapa de niveles de sonido")
 
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
+                modo_mapa = st.radio("Modo", ["Nodo × tiempo", "Mapa del campus"], horizontal=True)
                 palette = st.selectbox(
                     "Seleccione la paleta de colores:",
                     options=['jet', 'viridis', 'plasma', 'inferno', 'magma', 'coolwarm', 'YlOrRd', 'RdYlBu_r'],
                     index=0,
                 )
 
-            try:
-                X = df_filtrado['nodo'].astype(int).values
-            except ValueError:
-                X = df_filtrado['nodo'].astype('category').cat.codes.values + 1
-
-            # --- AHORA CALCULAMOS EL TIEMPO EN SEGUNDOS EN MÉXICO ---
-            fecha_inicio_dia = pd.to_datetime(f"{fecha} 00:00").tz_localize('America/Mexico_City')
-            tiempos_segundos = (df_filtrado['_time'] - fecha_inicio_dia).dt.total_seconds().values
-
-            Z = df_filtrado['_value'].astype(int).values
-
-            x_unique = np.unique(X)
-            y_unique = np.unique(tiempos_segundos)
-
-            if len(x_unique) > 1 and len(y_unique) > 1:
-
-                X_grid, Y_grid = np.meshgrid(x_unique, y_unique)
-                Z_grid = griddata((X, tiempos_segundos), Z, (X_grid, Y_grid), method='linear')
-                Z_grid = np.nan_to_num(Z_grid, nan=np.nanmin(Z_grid))
-
-                fig, ax = plt.subplots(figsize=(10, 6))
-
-                yticks_indices = np.linspace(0, len(y_unique)-1, num=10, dtype=int)
-                yticks_values = y_unique[yticks_indices]
-                yticklabels = [pd.to_datetime(t, unit='s').strftime('%H:%M') for t in yticks_values]
-
-                sb.heatmap(
-                    Z_grid,
-                    cmap=palette,
-                    xticklabels=x_unique,
-                    yticklabels=False,
-                    ax=ax
+            with perfil.etapa("mapa_calor", filas=len(df_filtrado)):
+                matriz_calor = obtener_artefacto(
+                    seleccion, "mapa_calor",
+                    lambda: construir_matriz(df_filtrado, resolucion=RESOLUCION_DEFAULT, huecos=calidad.huecos),
                 )
 
-                ax.invert_yaxis()
-                ax.set_yticks(yticks_indices + 0.5)
-                ax.set_yticklabels(yticklabels, rotation=0)
-                ax.set_xlabel("Nodos")
-                ax.set_ylabel("Hora (HH:MM)")
-
-                cbar = ax.collections[0].colorbar
-                cbar.set_label('Nivel de sonido (dB)', rotation=270, labelpad=20)
+            if modo_mapa == "Mapa del campus":
+                operador = None
+                try:
+                    coordenadas = cargar_coordenadas()
+                except ErrorDatos as e:
+                    st.error(str(e))
+                else:
+                    if coordenadas is None:
+                        st.warning(
+                            f"No se encontró '{RUTA_COORDENADAS}'. Agregue un CSV con columnas "
+                            "nodo, x, y (metros) o nodo, lat, lon para ver el mapa del campus."
+                        )
+                    elif matriz_calor is not None:
+                        with perfil.etapa("mapa_espacial_operador"):
+                            operador = operador_para(coordenadas, matriz_calor.nodos)
+                        if operador is None:
+                            st.warning("Se necesitan coordenadas de al menos dos nodos de la selección.")
+
+                if operador is not None:
+                    etiquetas = ["Promedio de la ventana"] + list(matriz_calor.tiempos.strftime('%H:%M'))
+                    cuadro_sel = st.select_slider(
+                        "Instante", options=range(len(etiquetas)), format_func=lambda i: etiquetas[i]
+                    )
+                    # Cada cuadro es un producto matriz–vector con los pesos cacheados
+                    with perfil.etapa("mapa_espacial_cuadro"):
+                        niveles = (
+                            niveles_promedio(matriz_calor.valores) if cuadro_sel == 0
+                            else matriz_calor.valores[cuadro_sel - 1]
+                        )
+                        cuadro = operador.interpolar(niveles)
+                    with perfil.etapa("mapa_espacial_render"):
+                        st.pyplot(dibujar_mapa(
+                            operador, cuadro, coordenadas, cmap=palette,
+                            vmin=np.nanmin(matriz_calor.valores), vmax=np.nanmax(matriz_calor.valores),
+                        ))
 
-                st.pyplot(fig)
+            elif matriz_calor is not None and min(matriz_calor.valores.shape) > 1:
+                with perfil.etapa("mapa_calor_render"):
+                    st.pyplot(dibujar_matriz(matriz_calor, cmap=palette))
 
             else:
                 st.warning("Datos insuficientes para generar el mapa de calor.")
 
 
-        # :::::::::::::::::::::::::::::::::::::::::::::::::::
-        #          LAS OTRAS TABS NO NECESITAN CAMBIOS
-        # :::::::::::::::::::::::::::::::::::::::::::::::::::
+        # Series para las gráficas de línea (tabs 2 y 3): nivel de agregación según el ancho
+        if vista in (vistas[1], vistas[2]):
+            with perfil.etapa("series") as etapa:
+                nodos_en_seleccion, paso_series, df_series = obtener_artefacto(
+                    seleccion, "series", lambda: calcular_series(df_filtrado, base=df, clave=clave_datos)
+                )
+                etapa.filas = len(df_series)
+            nota_agregacion = (
+                f"Agregado a {paso_series // 60} min: mínimo, media y máximo por intervalo."
+                if paso_series else None
+            )
 
         # TAB2
-        with tab2:
+        if vista == vistas[1]:
             st.markdown("#### Evolución temporal por nodo")
-            for nodo in sorted(df_filtrado["nodo"].astype(str).unique()):
-                st.subheader(f"Nodo {nodo}")
-                datos_nodo = df_filtrado[df_filtrado["nodo"].astype(str) == nodo]
-                st.line_chart(datos_nodo.set_index("_time")["_value"], height=200, use_container_width=True)
+            if nota_agregacion:
+                st.caption(nota_agregacion)
+
+            # Paginación: solo se envían al navegador las gráficas de una página
+            paginas = [
+                nodos_en_seleccion[i:i + NODOS_POR_PAGINA]
+                for i in range(0, len(nodos_en_seleccion), NODOS_POR_PAGINA)
+            ]
+            pagina = 0
+            if len(paginas) > 1:
+                pagina = st.selectbox(
+                    "Página:",
+                    options=range(len(paginas)),
+                    format_func=lambda i: f"Nodos {paginas[i][0]}–{paginas[i][-1]}",
+                )
+
+            with perfil.etapa("graficas_por_nodo", filas=len(df_series)):
+                for nodo in paginas[pagina]:
+                    st.subheader(f"Nodo {nodo}")
+                    datos_nodo = df_series[df_series["nodo"] == nodo]
+                    if paso_series:
+                        st.line_chart(datos_nodo.set_index("_time")[["minimo", "media", "maximo"]], height=200, use_container_width=True)
+                    else:
+                        st.line_chart(datos_nodo.set_index("_time")["media"].rename("_value"), height=200, use_container_width=True)
 
         # TAB3
-        with tab3:
+        elif vista == vistas[2]:
             st.markdown("### Comparación general de nodos en un solo gráfico")
-            df_pivot = df_filtrado.pivot(index='_time', columns='nodo', values='_value').sort_index()
-            df_pivot.columns = df_pivot.columns.astype(str)
-            st.line_chart(df_pivot, height=300, use_container_width=True)
+            if nota_agregacion:
+                st.caption(nota_agregacion.replace("mínimo, media y máximo", "máximo"))
+            with perfil.etapa("comparacion", filas=len(df_series)):
+                df_pivot = obtener_artefacto(seleccion, "pivote", lambda: pivote_maximos(df_series))
+                st.line_chart(df_pivot, height=300, use_container_width=True)
 
         # TAB4
-        with tab4:
-            st.markdown("### Análisis estadístico básico por nodo")
-            resumen_estadistico = df_filtrado.groupby("nodo")["_value"].agg(
-                Minimo="min", Maximo="max", Media="mean", Mediana="median", Conteo="count"
-            ).round(2)
+        elif vista == vistas[3]:
+            st.markdown("### Análisis estadístico por nodo")
+            st.caption("Leq es el promedio energético; L10, L50 y L90 son los niveles excedidos el 10, 50 y 90 % del tiempo.")
+            with perfil.etapa("estadisticos", filas=len(df_filtrado)):
+                resumen_estadistico, leq_horario = obtener_artefacto(
+                    seleccion, "estadisticos", lambda: calcular_estadisticos(df_filtrado, base=df, clave=clave_datos)
+                )
             st.dataframe(resumen_estadistico)
 
+            with st.expander("Leq por hora y nodo"):
+                st.dataframe(leq_horario)
+
         # TAB5
-        with tab5:
+        elif vista == vistas[4]:
             st.markdown("### Distribución de niveles de sonido por hora")
-            def clasificar_rango(db):
-                if db < 30: return "0–30 dB: Sin riesgo"
-                elif db < 60: return "30–60 dB: Sin riesgo"
-                elif db < 85: return "60–85 dB: Riesgo leve"
-                elif db < 100: return "85–100 dB: Riesgo moderado"
-                else: return "100–120+ dB: Peligroso"
-
-            df_filtrado["rango"] = df_filtrado["_value"].apply(clasificar_rango)
+            # Una sola tabla (hora × rango × nodo) para toda la selección
+            with perfil.etapa("riesgo_por_hora", filas=len(df_filtrado)):
+                distribucion = obtener_artefacto(
+                    seleccion, "distribucion_horaria", lambda: distribucion_horaria(df_filtrado, RANGOS_DB)
+                )
 
-            horas_disponibles = sorted(df_filtrado["hora"].unique())
+            horas_disponibles = distribucion.horas
             if horas_disponibles:
                 hora_seleccionada = st.selectbox("Selecciona hora:", options=horas_disponibles)
-                df_hora = df_filtrado[df_filtrado["hora"] == hora_seleccionada]
-                conteo = df_hora["rango"].value_counts().sort_index()
+                conteo = distribucion.por_hora(hora_seleccionada)
+                colores = RANGOS_DB.mapa_colores()
 
                 if not conteo.empty:
-                    colores = {
-                        "0–30 dB: Sin riesgo": "#b3d9ff",
-                        "30–60 dB: Sin riesgo": "#80bfff",
-                        "60–85 dB: Riesgo leve": "#ffcc80",
-                        "85–100 dB: Riesgo moderado": "#ff9966",
-                        "100–120+ dB: Peligroso": "#ff4d4d"
-                    }
                     colores_graf = [colores[c] for c in conteo.index]
 
                     fig, ax = plt.subplots()
@@ -498,6 +627,40 @@ elif seccion_activa == "Resultados":
                     ax.axis("equal")
                     st.pyplot(fig)
 
+                st.markdown("#### Distribución de las 24 horas (% de lecturas)")
+                st.bar_chart(
+                    distribucion.porcentajes_por_hora(),
+                    color=list(RANGOS_DB.colores),
+                    height=300,
+                    use_container_width=True,
+                )
+
+                st.markdown("#### Tiempo de exposición por nodo")
+                st.dataframe(tabla_exposicion(distribucion))
+
+            # Clasificación por el criterio de riesgo del sidebar (vectorizada)
+            st.markdown(f"#### Lecturas por nodo · {criterio_riesgo}")
+            with perfil.etapa("clasificacion", filas=len(df_filtrado)):
+                tabla_riesgo = riesgo_por_nodo(
+                    df_filtrado, CRITERIOS_RIESGO[criterio_riesgo], base=df, clave=clave_datos
+                )
+            st.dataframe(tabla_riesgo)
+
     else:
         st.warning("No hay datos para los parámetros seleccionados.")
 
+    # --- PANEL DE RENDIMIENTO ---
+    total_rerun = perfil.finalizar()
+    if mostrar_rendimiento:
+        with st.sidebar.expander("Rendimiento", expanded=True):
+            st.markdown(f"**Rerun:** {total_rerun * 1000:.1f} ms")
+            st.dataframe(pd.DataFrame(perfil.tabla()), hide_index=True)
+            st.markdown("**Historial del proceso (ms)**")
+            st.dataframe(pd.DataFrame(
+                [
+                    {"Etapa": nombre, "n": n, "p50": round(p50 * 1000, 2), "p95": round(p95 * 1000, 2)}
+                    for nombre, (n, p50, p95) in sorted(percentiles().items())
+                ]
+            ), hide_index=True)
+            st.download_button("Exportar métricas (Prometheus)", texto_prometheus(), file_name="metricas.txt")
+
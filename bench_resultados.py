@@ -0,0 +1,191 @@
+# --- BENCHMARK DEL PIPELINE DE RESULTADOS ---
+# Genera CSV anotados de InfluxDB sintéticos (mismo formato que 40nodos.csv)
+# y mide fuera de Streamlit cada etapa de la sección de Resultados:
+# lectura → normalización (tz) → índice → filtro → calidad → clasificación →
+# distribución horaria → mapa de calor → pivote/agregados → estadísticos. Reporta latencia por etapa, filas/s y
+# memoria pico en JSON para comparar corridas.
+#
+# Uso:  python bench_resultados.py --nodos 40 200 1000 --horas 48 --periodo 60 [--salida bench.json]
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from acustica import ParcialesAcusticos
+from agregados import PiramideAgregados
+from calidad_datos import evaluar_calidad
+from carga_datos import ZONA_HORARIA, leer_csv_crudo, normalizar
+from clasificacion import RANGOS_DB, RIESGO_AUDITIVO, agregar_clasificacion, distribucion_horaria
+from fuente_influx import ANCHO_GRAFICO_PX
+from indice_lecturas import IndiceLecturas
+from mapa_calor import construir_matriz
+
+ANOTACIONES = (
+    "#group,false,false,true,true,false,false,true,true,true\n"
+    "#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string,string\n"
+    "#default,mean,,,,,,,,\n"
+    ",result,table,_start,_stop,_time,_value,_field,_measurement,nodo\n"
+)
+
+
+def generar_csv(ruta, nodos=40, horas=48, periodo_s=520, inicio="2025-06-27T18:00:00Z", semilla=0):
+    """Escribe un CSV anotado con `nodos` series de `horas` h cada `periodo_s` s."""
+    rng = np.random.default_rng(semilla)
+    t0 = pd.Timestamp(inicio)
+    n = int(horas * 3600 // periodo_s)
+    tiempos = t0 + pd.to_timedelta(np.arange(n) * periodo_s, unit="s")
+    hora_local = (tiempos.tz_convert(ZONA_HORARIA).hour.to_numpy() + tiempos.minute.to_numpy() / 60.0)
+    # Patrón diario (más ruido de día) más variación por nodo y ruido aleatorio
+    patron = 52.0 + 8.0 * np.clip(np.sin((hora_local - 6.0) / 24.0 * 2 * np.pi), 0, None)
+
+    inicio_txt = t0.strftime("%Y-%m-%dT%H:%M:%SZ")
+    fin_txt = tiempos[-1].strftime("%Y-%m-%dT%H:%M:%SZ")
+    tiempos_txt = np.asarray(tiempos.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(ANOTACIONES)
+        for tabla, nodo in enumerate(range(1, nodos + 1)):
+            valores = patron + rng.normal(0, 3.0, n) + rng.uniform(-4, 4)
+            bloque = pd.DataFrame({
+                "a": "", "result": "", "table": tabla,
+                "_start": inicio_txt, "_stop": fin_txt,
+                "_time": tiempos_txt, "_value": np.round(valores, 4),
+                "_field": "leq", "_measurement": "leq", "nodo": nodo,
+            })
+            bloque.to_csv(f, header=False, index=False)
+    return nodos * n
+
+
+def correr_pipeline(ruta, horas_ventana=24, trazar_memoria=False):
+    """Ejecuta una vez cada etapa; devuelve {etapa: (segundos, pico_bytes, filas)}.
+
+    tracemalloc encarece cada asignación, así que con `trazar_memoria` los
+    tiempos no son representativos: se hacen corridas separadas para cada cosa.
+    """
+    etapas = {}
+
+    def _medir(funcion):
+        if trazar_memoria:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+        pico = 0
+        if trazar_memoria:
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return resultado, segundos, pico
+
+    crudo, s, pico = _medir(lambda: leer_csv_crudo(ruta))
+    etapas["lectura"] = (s, pico, len(crudo))
+
+    df, s, pico = _medir(lambda: normalizar(crudo))
+    etapas["normalizacion_tz"] = (s, pico, len(crudo))
+
+    inicio = df["_time"].min().floor("D")
+    fin = inicio + pd.Timedelta(hours=horas_ventana)
+    nodos = list(df["nodo"].cat.categories)
+
+    # Como en la app: el índice se construye una vez por archivo y cada
+    # ventana se recorta con búsqueda binaria
+    indice, s, pico = _medir(lambda: IndiceLecturas(df))
+    etapas["indice"] = (s, pico, len(df))
+
+    df_filtrado, s, pico = _medir(lambda: indice.ventana(df, inicio, fin, nodos))
+    etapas["filtro"] = (s, pico, len(df))
+
+    _, s, pico = _medir(lambda: evaluar_calidad(df_filtrado))
+    etapas["calidad"] = (s, pico, len(df_filtrado))
+
+    _, s, pico = _medir(lambda: agregar_clasificacion(df_filtrado.copy(deep=False), RIESGO_AUDITIVO))
+    etapas["clasificacion"] = (s, pico, len(df_filtrado))
+
+    _, s, pico = _medir(lambda: distribucion_horaria(df_filtrado, RANGOS_DB))
+    etapas["distribucion_horaria"] = (s, pico, len(df_filtrado))
+
+    _, s, pico = _medir(lambda: construir_matriz(df_filtrado))
+    etapas["mapa_calor"] = (s, pico, len(df_filtrado))
+
+    def pivote():
+        piramide = PiramideAgregados.desde_lecturas(df)
+        _, serie = piramide.consultar(inicio, fin, nodos, ANCHO_GRAFICO_PX, seleccion=df_filtrado)
+        return serie.pivot_table(index="_time", columns="nodo", values="maximo", observed=True)
+
+    _, s, pico = _medir(pivote)
+    etapas["agregados_pivote"] = (s, pico, len(df))
+
+    def estadisticos():
+        return ParcialesAcusticos.desde_lecturas(df_filtrado).combinar(["nodo"]).estadisticos()
+
+    _, s, pico = _medir(estadisticos)
+    etapas["estadisticos"] = (s, pico, len(df_filtrado))
+    return etapas
+
+
+def resumir(corridas, memoria):
+    resumen = {}
+    for etapa in corridas[0]:
+        tiempos = [c[etapa][0] for c in corridas]
+        filas = corridas[0][etapa][2]
+        mediana = statistics.median(tiempos)
+        resumen[etapa] = {
+            "mediana_s": round(mediana, 6),
+            "min_s": round(min(tiempos), 6),
+            "filas": filas,
+            "filas_por_s": round(filas / mediana) if mediana > 0 else None,
+            "pico_mb": round(memoria[etapa][1] / 2**20, 3),
+        }
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de Resultados.")
+    parser.add_argument("--nodos", type=int, nargs="+", default=[40, 200, 1000])
+    parser.add_argument("--horas", type=float, default=48, help="Duración del CSV sintético")
+    parser.add_argument("--periodo", type=float, default=520, help="Segundos entre lecturas")
+    parser.add_argument("--ventana", type=float, default=24, help="Horas seleccionadas en el filtro")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    reporte = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "horas": args.horas,
+        "periodo_s": args.periodo,
+        "ventana_h": args.ventana,
+        "casos": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for nodos in args.nodos:
+            ruta = os.path.join(tmp, f"sintetico_{nodos}.csv")
+            filas = generar_csv(ruta, nodos=nodos, horas=args.horas, periodo_s=args.periodo)
+            corridas = [correr_pipeline(ruta, args.ventana) for _ in range(args.repeticiones)]
+            memoria = correr_pipeline(ruta, args.ventana, trazar_memoria=True)
+            etapas = resumir(corridas, memoria)
+            reporte["casos"].append({
+                "nodos": nodos,
+                "filas": filas,
+                "bytes_csv": os.path.getsize(ruta),
+                "total_s": round(sum(e["mediana_s"] for e in etapas.values()), 6),
+                "etapas": etapas,
+            })
+
+    texto = json.dumps(reporte, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
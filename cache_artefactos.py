@@ -0,0 +1,38 @@
+# --- CACHÉ DE ARTEFACTOS POR SELECCIÓN, COMPARTIDA ENTRE SESIONES ---
+# Matrices del mapa de calor, series, pivotes, estadísticos y conteos se
+# memorizan por (versión de los datos, inicio, fin, nodos, tipo de artefacto).
+# Dos personas con la misma selección comparten el resultado, y cambiar de
+# pestaña o de paleta no lo recalcula: las opciones de presentación (paleta,
+# colores) se aplican después, sobre el resultado numérico cacheado.
+
+import pandas as pd
+
+from cache_lru import espacio_cache
+
+_cache_artefactos = espacio_cache("artefactos")
+
+
+def clave_seleccion(version, inicio, fin, nodos):
+    """Clave de una selección; None si los datos no tienen versión (modo en vivo)."""
+    if version is None:
+        return None
+    return (
+        version,
+        pd.Timestamp(inicio).value,
+        pd.Timestamp(fin).value,
+        tuple(sorted(str(n) for n in nodos)),
+    )
+
+
+def obtener_artefacto(seleccion, tipo, calcular):
+    """Resultado de `calcular()` memorizado para la selección y el tipo dados.
+
+    El resultado se comparte entre sesiones: no debe modificarse en sitio.
+    """
+    if seleccion is None:
+        return calcular()
+    return _cache_artefactos.obtener_o_calcular((seleccion, tipo), calcular)
+
+
+def limpiar_cache():
+    _cache_artefactos.limpiar()
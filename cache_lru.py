@@ -0,0 +1,132 @@
+# --- CACHÉ LRU CON PRESUPUESTO DE MEMORIA ---
+# Caché compartida por todas las sesiones de Streamlit (vive a nivel de módulo,
+# que el servidor importa una sola vez). Cada entrada registra su tamaño en
+# bytes y, al rebasar el presupuesto, se descartan las menos usadas.
+#
+# Todos los módulos (datos cargados, índices, agregados, artefactos...) usan
+# secciones de UNA sola caché global, así que RUIDO_CACHE_MB acota la memoria
+# de toda la aplicación y la LRU decide entre todas las entradas a la vez.
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def estimar_bytes(obj):
+    """Tamaño aproximado en memoria de un resultado cacheado."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (tuple, list)):
+        return sum(estimar_bytes(o) for o in obj)
+    if isinstance(obj, dict):
+        return sum(estimar_bytes(o) for o in obj.values())
+    nbytes = getattr(obj, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    return 64
+
+
+class CacheLRU:
+    """Caché LRU segura entre hilos, acotada por número de bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, default=None):
+        with self._lock:
+            if clave not in self._entradas:
+                return default
+            self._entradas.move_to_end(clave)
+            return self._entradas[clave][0]
+
+    def guardar(self, clave, valor, nbytes=None):
+        nbytes = estimar_bytes(valor) if nbytes is None else int(nbytes)
+        with self._lock:
+            if clave in self._entradas:
+                self._bytes -= self._entradas.pop(clave)[1]
+            # Un valor mayor que todo el presupuesto no se guarda
+            if nbytes > self.max_bytes:
+                return valor
+            self._entradas[clave] = (valor, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entradas:
+                _, (_, liberados) = self._entradas.popitem(last=False)
+                self._bytes -= liberados
+        return valor
+
+    def obtener_o_calcular(self, clave, calcular):
+        valor = self.obtener(clave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = self.guardar(clave, calcular())
+        return valor
+
+    def descartar(self, predicado):
+        """Elimina las entradas cuya clave cumple `predicado`."""
+        with self._lock:
+            for clave in [c for c in self._entradas if predicado(c)]:
+                self._bytes -= self._entradas.pop(clave)[1]
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    @property
+    def bytes_usados(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, clave):
+        return clave in self._entradas
+
+
+_AUSENTE = object()
+
+
+class EspacioCache:
+    """Sección con nombre de una CacheLRU: comparte su presupuesto y su orden LRU."""
+
+    def __init__(self, nombre, cache):
+        self.nombre = nombre
+        self._cache = cache
+
+    def obtener(self, clave, default=None):
+        return self._cache.obtener((self.nombre, clave), default)
+
+    def guardar(self, clave, valor, nbytes=None):
+        return self._cache.guardar((self.nombre, clave), valor, nbytes)
+
+    def obtener_o_calcular(self, clave, calcular):
+        return self._cache.obtener_o_calcular((self.nombre, clave), calcular)
+
+    def descartar(self, predicado):
+        self._cache.descartar(lambda c: c[0] == self.nombre and predicado(c[1]))
+
+    def limpiar(self):
+        self.descartar(lambda c: True)
+
+    def __contains__(self, clave):
+        return (self.nombre, clave) in self._cache
+
+
+# Presupuesto de memoria de toda la aplicación (MB)
+CACHE_MAX_MB = int(os.environ.get("RUIDO_CACHE_MB", "512"))
+
+_cache_global = CacheLRU(CACHE_MAX_MB * 1024 * 1024)
+
+
+def espacio_cache(nombre):
+    """Sección `nombre` de la caché global de la aplicación."""
+    return EspacioCache(nombre, _cache_global)
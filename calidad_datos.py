@@ -0,0 +1,159 @@
+# --- CALIDAD DE LOS DATOS: HUECOS, JITTER, DUPLICADOS Y RANGO ---
+# Una pasada vectorizada sobre las lecturas ordenadas por (nodo, _time):
+# las diferencias entre lecturas consecutivas del mismo nodo dan el periodo
+# de muestreo (mediana), su dispersión (jitter), las marcas de tiempo
+# repetidas y los huecos (saltos mayores a FACTOR_HUECO periodos). Se cuenta
+# además cuántas lecturas salen del rango físico del sensor y cuántas filas
+# se descartaron al cargar. El resultado se cachea con el archivo y alimenta
+# el resumen de disponibilidad y las celdas enmascaradas del mapa de calor.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from cache_lru import espacio_cache
+
+# Rango físico plausible de los sensores (dB)
+RANGO_DB_VALIDO = (20.0, 140.0)
+# Un salto es hueco si supera FACTOR_HUECO periodos y HUECO_MIN_S segundos
+FACTOR_HUECO = 3.0
+HUECO_MIN_S = 60.0
+
+_cache_calidad = espacio_cache("calidad")
+
+
+@dataclass
+class CalidadDatos:
+    resumen: pd.DataFrame  # una fila por nodo
+    huecos: pd.DataFrame  # nodo, inicio, fin, duracion_s
+    primera: pd.Series  # primera y última lectura por nodo
+    ultima: pd.Series
+    descartadas: int  # filas sin fecha, nodo o valor interpretables
+
+    @property
+    def nbytes(self):
+        return int(
+            self.resumen.memory_usage(index=True).sum() + self.huecos.memory_usage(index=True).sum()
+        )
+
+    def huecos_en(self, inicio, fin, nodos=None):
+        """Huecos que se traslapan con [inicio, fin] (de `nodos`, si se dan)."""
+        huecos = self.huecos
+        traslape = (huecos["fin"] > inicio) & (huecos["inicio"] < fin)
+        if nodos is not None:
+            traslape &= huecos["nodo"].isin([str(n) for n in nodos])
+        return huecos[traslape]
+
+    def disponibilidad(self, inicio, fin, nodos=None):
+        """Porcentaje de [inicio, fin] cubierto por lecturas, por nodo."""
+        nodos = list(self.resumen.index) if nodos is None else [str(n) for n in nodos]
+        t_ini = pd.Timestamp(inicio).value
+        t_fin = pd.Timestamp(fin).value
+        duracion = max(t_fin - t_ini, 1)
+
+        primera = self.primera.reindex(nodos).array.asi8
+        ultima = self.ultima.reindex(nodos).array.asi8
+        sin_datos = self.primera.reindex(nodos).isna().to_numpy()
+        cubierto = np.clip(ultima, t_ini, t_fin) - np.clip(primera, t_ini, t_fin)
+
+        huecos = self.huecos_en(inicio, fin, nodos)
+        if len(huecos):
+            recorte = (
+                np.clip(huecos["fin"].array.asi8, t_ini, t_fin)
+                - np.clip(huecos["inicio"].array.asi8, t_ini, t_fin)
+            )
+            posicion = pd.Index(nodos).get_indexer(huecos["nodo"].astype(str))
+            cubierto = cubierto - np.bincount(posicion, weights=recorte, minlength=len(nodos))
+
+        porcentaje = np.where(sin_datos, 0.0, 100.0 * np.clip(cubierto, 0, None) / duracion)
+        return pd.Series(porcentaje.round(1), index=pd.Index(nodos, name="nodo"), name="Disponibilidad (%)")
+
+
+def evaluar_calidad(df, rango_db=RANGO_DB_VALIDO):
+    """Indicadores de calidad de `df` (una sola pasada sobre los datos ordenados)."""
+    nodos = df["nodo"].astype("category")
+    categorias = [str(n) for n in nodos.cat.categories]
+    codigos = nodos.cat.codes.to_numpy().astype(np.int64)
+    tiempos = df["_time"].dt.as_unit("ns").array.asi8
+    valores = df["_value"].to_numpy(dtype=np.float32)
+
+    n_nodos = len(categorias)
+    lecturas = np.bincount(codigos, minlength=n_nodos)
+
+    # Las lecturas de cada nodo deben ser contiguas y crecientes en el tiempo
+    mismo = codigos[1:] == codigos[:-1]
+    inicios_grupo = np.flatnonzero(np.r_[True, ~mismo]) if len(codigos) else np.array([], dtype=np.int64)
+    if len(inicios_grupo) != np.count_nonzero(lecturas) or (np.diff(tiempos)[mismo] < 0).any():
+        orden = np.lexsort((tiempos, codigos))
+        codigos, tiempos, valores = codigos[orden], tiempos[orden], valores[orden]
+        mismo = codigos[1:] == codigos[:-1]
+        inicios_grupo = np.flatnonzero(np.r_[True, ~mismo])
+
+    fuera = np.bincount(codigos, weights=(valores < rango_db[0]) | (valores > rango_db[1]), minlength=n_nodos)
+
+    pares = np.flatnonzero(mismo)
+    delta = (tiempos[pares + 1] - tiempos[pares]) / 1e9
+    codigo_par = codigos[pares]
+    duplicados = np.bincount(codigo_par, weights=delta == 0, minlength=n_nodos)
+
+    positivos = delta > 0
+    periodo = (
+        pd.Series(delta[positivos]).groupby(codigo_par[positivos]).median()
+        .reindex(range(n_nodos)).to_numpy()
+    )
+    with np.errstate(invalid="ignore"):
+        es_hueco = delta > np.maximum(FACTOR_HUECO * periodo, HUECO_MIN_S)[codigo_par]
+
+    # Jitter: desviación estándar de los intervalos regulares (sin huecos ni duplicados)
+    regulares = positivos & ~es_hueco
+    n = np.bincount(codigo_par[regulares], minlength=n_nodos)
+    suma = np.bincount(codigo_par[regulares], weights=delta[regulares], minlength=n_nodos)
+    suma2 = np.bincount(codigo_par[regulares], weights=delta[regulares] ** 2, minlength=n_nodos)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        jitter = np.sqrt(np.clip(suma2 / n - (suma / n) ** 2, 0, None))
+
+    zona = df["_time"].dt.tz
+    en_hueco = pares[es_hueco]
+    huecos = pd.DataFrame({
+        "nodo": pd.Categorical.from_codes(codigos[en_hueco], categories=categorias),
+        "inicio": pd.to_datetime(tiempos[en_hueco], utc=True).tz_convert(zona),
+        "fin": pd.to_datetime(tiempos[en_hueco + 1], utc=True).tz_convert(zona),
+        "duracion_s": delta[es_hueco],
+    })
+
+    indice = pd.Index(categorias, name="nodo")
+    primera = pd.Series(pd.NaT, index=indice, dtype=df["_time"].dtype)
+    ultima = primera.copy()
+    if len(inicios_grupo):
+        finales_grupo = np.r_[inicios_grupo[1:] - 1, len(codigos) - 1]
+        con_datos = indice[codigos[inicios_grupo]]
+        primera[con_datos] = pd.to_datetime(tiempos[inicios_grupo], utc=True).tz_convert(zona)
+        ultima[con_datos] = pd.to_datetime(tiempos[finales_grupo], utc=True).tz_convert(zona)
+
+    resumen = pd.DataFrame({
+        "Lecturas": lecturas,
+        "Periodo (s)": np.round(periodo, 1),
+        "Jitter (s)": np.round(jitter, 1),
+        "Duplicados": duplicados.astype(np.int64),
+        "Fuera de rango": fuera.astype(np.int64),
+        "Huecos": np.bincount(codigo_par[es_hueco], minlength=n_nodos),
+        "Sin datos (min)": np.round(
+            np.bincount(codigo_par[es_hueco], weights=delta[es_hueco], minlength=n_nodos) / 60, 1
+        ),
+    }, index=indice)
+
+    return CalidadDatos(
+        resumen=resumen,
+        huecos=huecos,
+        primera=primera,
+        ultima=ultima,
+        descartadas=int(df.attrs.get("descartadas", 0)),
+    )
+
+
+def calidad_para(df, clave=None):
+    """Calidad de `df`; si se da `clave` (versión del archivo) se cachea entre sesiones."""
+    if clave is None:
+        return evaluar_calidad(df)
+    return _cache_calidad.obtener_o_calcular(("calidad", clave), lambda: evaluar_calidad(df))
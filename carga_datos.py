@@ -0,0 +1,228 @@
+# --- CAPA DE CARGA DE DATOS (RESULTADOS) ---
+# Lee una exportación de InfluxDB una sola vez y reutiliza el DataFrame
+# resultante entre reruns y sesiones. La clave de la caché es
+# (ruta, mtime, tamaño), así que un archivo modificado se vuelve a leer.
+# También acepta un directorio o un patrón glob con varias exportaciones
+# (una por día o por campaña): se leen en paralelo con un pool de procesos,
+# se eliminan las filas (nodo, _time) repetidas por ventanas traslapadas y
+# se unen en un solo DataFrame ordenado.
+#
+# Representación compacta: solo _time (datetime64[ns], 8 B), nodo (códigos
+# de categoría de 1–2 B) y _value (float32, 4 B) por lectura. Un mismo
+# DataFrame lo leen todas las sesiones; con copy-on-write las selecciones
+# que se derivan de él son vistas y nunca lo modifican.
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from cache_lru import espacio_cache
+from influx_csv import es_csv_anotado, leer_csv_anotado
+
+ZONA_HORARIA = "America/Mexico_City"
+COLUMNAS_REQUERIDAS = ["_time", "nodo", "_value"]
+
+_cache_datos = espacio_cache("datos")
+
+# En pandas 3 copy-on-write siempre está activo
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+class ErrorDatos(ValueError):
+    """El archivo existe pero su contenido no se puede interpretar."""
+
+
+def clave_archivo(ruta):
+    """Identifica una versión concreta del archivo en disco."""
+    info = os.stat(ruta)
+    return (os.path.abspath(ruta), info.st_mtime_ns, info.st_size)
+
+
+def resolver_archivos(fuente):
+    """Rutas de CSV de una fuente: archivo, directorio o patrón glob."""
+    if os.path.isdir(fuente):
+        return sorted(glob.glob(os.path.join(fuente, "*.csv")))
+    if glob.has_magic(fuente):
+        return sorted(glob.glob(fuente))
+    return [fuente] if os.path.exists(fuente) else []
+
+
+def clave_fuente(fuente):
+    """Versión de todos los archivos de la fuente; cambia si se agrega o modifica uno."""
+    return _clave_rutas(resolver_archivos(fuente))
+
+
+def _clave_rutas(rutas):
+    if len(rutas) == 1:
+        return clave_archivo(rutas[0])
+    return tuple(clave_archivo(r) for r in rutas)
+
+
+def _clean_cols(cols):
+    return [str(c).strip().replace('\ufeff', '') for c in cols]
+
+
+def leer_csv_crudo(ruta):
+    # Exportaciones de InfluxDB: una sola lectura, tipada por #datatype
+    if es_csv_anotado(ruta):
+        return leer_csv_anotado(ruta, COLUMNAS_REQUERIDAS)
+
+    # CSV plano (exportado a mano): se normalizan los nombres de columna
+    # leyendo solo el encabezado, y luego solo se materializan las útiles
+    columnas = pd.read_csv(ruta, nrows=0).columns
+
+    cols_lower = {c.lower().strip().replace('\ufeff', ''): c for c in columnas}
+    mapping = {}
+    if '_time' in cols_lower: mapping[cols_lower['_time']] = '_time'
+    if 'time' in cols_lower and '_time' not in cols_lower: mapping[cols_lower['time']] = '_time'
+    if '_value' in cols_lower: mapping[cols_lower['_value']] = '_value'
+    elif 'value' in cols_lower: mapping[cols_lower['value']] = '_value'
+    if 'nodo' in cols_lower: mapping[cols_lower['nodo']] = 'nodo'
+    elif 'node' in cols_lower: mapping[cols_lower['node']] = 'nodo'
+
+    usecols = list(mapping) if mapping else None
+    df_try = pd.read_csv(ruta, usecols=usecols, dtype={c: str for c in mapping if mapping[c] != '_value'})
+    df_try.columns = _clean_cols(df_try.columns)
+    return df_try.rename(columns={c.strip().replace('\ufeff', ''): n for c, n in mapping.items()})
+
+
+def _nodos_categoricos(nodos):
+    """Convierte `nodo` a categoría con orden numérico cuando es posible."""
+    if isinstance(nodos.dtype, pd.CategoricalDtype):
+        nodos = nodos.cat.rename_categories(lambda c: str(c).strip())
+        unicos = list(nodos.cat.categories)
+    else:
+        nodos = nodos.astype(str).str.strip()
+        unicos = list(nodos.unique())
+    try:
+        orden = sorted(unicos, key=int)
+    except ValueError:
+        orden = sorted(unicos)
+    if isinstance(nodos.dtype, pd.CategoricalDtype):
+        return nodos.cat.reorder_categories(orden).cat.remove_unused_categories().values
+    return pd.Categorical(nodos, categories=orden)
+
+
+def normalizar(df):
+    """Tipa un DataFrame crudo: `_time` tz-aware (México), `nodo` categórico y `_value` float32.
+
+    Las filas quedan ordenadas por (nodo, _time), lo que permite recortar
+    ventanas por búsqueda binaria (ver indice_lecturas.py).
+    """
+    if not all(col in df.columns for col in COLUMNAS_REQUERIDAS):
+        raise ErrorDatos("El archivo no contiene las columnas necesarias (_time, nodo, _value).")
+
+    df = df[COLUMNAS_REQUERIDAS]
+    valores = pd.to_numeric(df['_value'], errors='coerce')
+    tiempos = df['_time']
+    if not isinstance(tiempos.dtype, pd.DatetimeTZDtype):
+        tiempos = pd.to_datetime(tiempos, errors='coerce', utc=True, format='ISO8601')
+    validos = tiempos.notna() & valores.notna() & df['nodo'].notna()
+
+    if not validos.any():
+        raise ErrorDatos("No se pudieron interpretar las fechas en la columna '_time'.")
+
+    nodos = df['nodo']
+    if not validos.all():
+        tiempos, valores, nodos = tiempos[validos], valores[validos], nodos[validos]
+
+    df = pd.DataFrame({
+        # Convertir a México UNA SOLA VEZ
+        '_time': tiempos.dt.tz_convert(ZONA_HORARIA).dt.as_unit('ns').array,
+        'nodo': _nodos_categoricos(nodos),
+        '_value': valores.to_numpy(dtype=np.float32),
+    }, copy=False)
+
+    # Filas descartadas, para el resumen de calidad (ver calidad_datos.py)
+    df.attrs['descartadas'] = int((~validos).sum())
+
+    codigos = df['nodo'].cat.codes.to_numpy()
+    tiempos_ns = df['_time'].array.asi8
+    ordenado = (np.diff(codigos) >= 0).all() and (
+        (np.diff(tiempos_ns) >= 0) | (np.diff(codigos) > 0)
+    ).all()
+    if ordenado:
+        return df
+    return df.take(np.lexsort((tiempos_ns, codigos))).reset_index(drop=True)
+
+
+def cargar_archivo(ruta):
+    """Lee y normaliza un solo CSV (también es la tarea de cada proceso del pool).
+
+    Una exportación vacía o con solo el encabezado da None: en un directorio
+    de exportaciones no debe hacer fallar la carga de las demás.
+    """
+    if os.path.getsize(ruta) == 0:
+        return None
+    crudo = leer_csv_crudo(ruta)
+    if crudo.empty:
+        return None
+    return normalizar(crudo)
+
+
+def unir(partes):
+    """Une DataFrames normalizados; ante (nodo, _time) repetido gana el del último.
+
+    Las partes None o vacías se ignoran; si no queda ninguna, devuelve None.
+    """
+    partes = [p for p in partes if p is not None and not p.empty]
+    if not partes:
+        return None
+    if len(partes) == 1:
+        return partes[0]
+    nodos = union_categoricals([p['nodo'] for p in partes], ignore_order=True)
+    df = pd.DataFrame({
+        '_time': pd.concat([p['_time'] for p in partes], ignore_index=True).array,
+        'nodo': _nodos_categoricos(pd.Series(nodos)),
+        '_value': np.concatenate([p['_value'].to_numpy() for p in partes]),
+    }, copy=False)
+
+    # lexsort es estable: entre duplicados, el último archivo queda al final
+    codigos = df['nodo'].cat.codes.to_numpy()
+    tiempos_ns = df['_time'].array.asi8
+    orden = np.lexsort((tiempos_ns, codigos))
+    codigos, tiempos_ns = codigos[orden], tiempos_ns[orden]
+    ultimo = np.ones(len(orden), dtype=bool)
+    ultimo[:-1] = (codigos[1:] != codigos[:-1]) | (tiempos_ns[1:] != tiempos_ns[:-1])
+    df = df.take(orden[ultimo]).reset_index(drop=True)
+    df.attrs['descartadas'] = sum(p.attrs.get('descartadas', 0) for p in partes)
+    return df
+
+
+def cargar_resultados(fuente, procesos=None):
+    """(DataFrame tipado, versión) de la fuente, compartido mientras sus archivos no cambien.
+
+    `fuente` puede ser un archivo, un directorio o un patrón glob; con varios
+    archivos, se leen en paralelo con hasta `procesos` procesos (por defecto,
+    uno por núcleo). El resultado se comparte entre sesiones: no debe
+    modificarse en sitio. La versión es la clave con la que quedó en caché;
+    los cachés derivados (índice, clasificación, artefactos) deben usar esa
+    y no volver a consultar `clave_fuente`, que puede cambiar entre llamadas
+    si el archivo está creciendo.
+    """
+    rutas = resolver_archivos(fuente)
+    if not rutas:
+        raise FileNotFoundError(f"El archivo de datos '{fuente}' no fue encontrado.")
+    clave = _clave_rutas(rutas)
+
+    def calcular():
+        trabajadores = min(len(rutas), procesos or os.cpu_count() or 1)
+        if trabajadores == 1:
+            df = unir([cargar_archivo(r) for r in rutas])
+        else:
+            with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+                df = unir(list(pool.map(cargar_archivo, rutas)))
+        if df is None:
+            raise ErrorDatos(f"'{fuente}' no contiene lecturas.")
+        return df
+
+    return _cache_datos.obtener_o_calcular(clave, calcular), clave
+
+
+def limpiar_cache():
+    _cache_datos.limpiar()
@@ -0,0 +1,196 @@
+# --- CLASIFICACIÓN POR BANDAS DE NIVEL SONORO ---
+# Los umbrales en dB se definen una sola vez como tablas de bandas y la
+# clasificación es un np.digitize vectorizado que devuelve categorías. Cuando
+# los datos vienen de un archivo cacheado, la clasificación del archivo
+# completo se cachea junto a él y cada selección solo toma sus filas.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from cache_lru import espacio_cache
+
+_cache_clasificacion = espacio_cache("clasificacion")
+
+
+@dataclass(frozen=True)
+class TablaBandas:
+    """Bandas [límite_i, límite_i+1) en dB; hay una etiqueta más que límites."""
+
+    limites: tuple
+    etiquetas: tuple
+    colores: tuple = ()
+
+    def __post_init__(self):
+        if len(self.etiquetas) != len(self.limites) + 1:
+            raise ValueError("Se necesita exactamente una etiqueta más que límites.")
+        if list(self.limites) != sorted(self.limites):
+            raise ValueError("Los límites deben estar en orden creciente.")
+
+    def clasificar(self, df):
+        codigos = np.digitize(df["_value"].to_numpy(), self.limites)
+        return pd.Categorical.from_codes(codigos, categories=list(self.etiquetas))
+
+    def mapa_colores(self):
+        return dict(zip(self.etiquetas, self.colores))
+
+
+@dataclass(frozen=True)
+class TablaBandasHoraria:
+    """Bandas distintas de día y de noche (hora local), con las mismas etiquetas."""
+
+    diurna: TablaBandas
+    nocturna: TablaBandas
+    hora_inicio_diurna: int = 6
+    hora_fin_diurna: int = 20
+
+    def __post_init__(self):
+        if self.diurna.etiquetas != self.nocturna.etiquetas:
+            raise ValueError("Las bandas diurna y nocturna deben compartir etiquetas.")
+
+    @property
+    def etiquetas(self):
+        return self.diurna.etiquetas
+
+    def clasificar(self, df):
+        valores = df["_value"].to_numpy()
+        hora = df["_time"].dt.hour.to_numpy()
+        diurno = (hora >= self.hora_inicio_diurna) & (hora < self.hora_fin_diurna)
+        codigos = np.where(
+            diurno,
+            np.digitize(valores, self.diurna.limites),
+            np.digitize(valores, self.nocturna.limites),
+        )
+        return pd.Categorical.from_codes(codigos, categories=list(self.etiquetas))
+
+
+# Riesgo auditivo por exposición
+RIESGO_AUDITIVO = TablaBandas(
+    limites=(85, 100),
+    etiquetas=("Seguro", "Riesgo moderado", "Peligroso"),
+)
+
+# Rangos de la gráfica de pastel (Tab 5)
+RANGOS_DB = TablaBandas(
+    limites=(30, 60, 85, 100),
+    etiquetas=(
+        "0–30 dB: Sin riesgo",
+        "30–60 dB: Sin riesgo",
+        "60–85 dB: Riesgo leve",
+        "85–100 dB: Riesgo moderado",
+        "100–120+ dB: Peligroso",
+    ),
+    colores=("#b3d9ff", "#80bfff", "#ffcc80", "#ff9966", "#ff4d4d"),
+)
+
+# Límites de emisión de la NADF-005-AMBT-2013 (CDMX):
+# 65 dB(A) de 6:00 a 20:00 h y 62 dB(A) de 20:00 a 6:00 h
+NADF_005_AMBT_2013 = TablaBandasHoraria(
+    diurna=TablaBandas((65,), ("Dentro del límite", "Excede límite")),
+    nocturna=TablaBandas((62,), ("Dentro del límite", "Excede límite")),
+)
+
+CRITERIOS_RIESGO = {
+    "Riesgo auditivo (85/100 dB)": RIESGO_AUDITIVO,
+    "NADF-005-AMBT-2013 (65/62 dB)": NADF_005_AMBT_2013,
+}
+
+
+def agregar_clasificacion(df_filtrado, criterio=RIESGO_AUDITIVO, base=None, clave=None):
+    """Agrega las columnas categóricas `riesgo` y `rango` a la selección.
+
+    Si se dan `base` (el DataFrame cargado completo, del que `df_filtrado` es
+    un subconjunto por índice) y `clave` (su versión), la clasificación de
+    `base` se calcula una vez y se reutiliza en todas las selecciones.
+    """
+    if base is not None and clave is not None:
+        posiciones = df_filtrado.index.to_numpy()
+        for columna, tabla in (("riesgo", criterio), ("rango", RANGOS_DB)):
+            completa = _cache_clasificacion.obtener_o_calcular(
+                (clave, tabla), lambda tabla=tabla: tabla.clasificar(base)
+            )
+            df_filtrado[columna] = completa.take(posiciones)
+    else:
+        df_filtrado["riesgo"] = criterio.clasificar(df_filtrado)
+        df_filtrado["rango"] = RANGOS_DB.clasificar(df_filtrado)
+    return df_filtrado
+
+
+@dataclass
+class DistribucionHoraria:
+    """Conteos y segundos de exposición por (hora del día, banda, nodo)."""
+
+    conteos: np.ndarray  # (24, bandas, nodos)
+    segundos: np.ndarray  # (24, bandas, nodos)
+    tabla: TablaBandas
+    nodos: list
+
+    @property
+    def nbytes(self):
+        return int(self.conteos.nbytes + self.segundos.nbytes)
+
+    @property
+    def horas(self):
+        """Horas del día con al menos una lectura."""
+        return [int(h) for h in np.flatnonzero(self.conteos.sum(axis=(1, 2)))]
+
+    def por_hora(self, hora):
+        """Conteo por banda en la hora dada (todos los nodos), sin bandas vacías."""
+        conteo = pd.Series(self.conteos[hora].sum(axis=1), index=list(self.tabla.etiquetas))
+        return conteo[conteo > 0]
+
+    def porcentajes_por_hora(self):
+        """DataFrame hora × banda con el % de lecturas de cada banda."""
+        conteos = self.conteos.sum(axis=2)
+        horas = self.horas
+        totales = conteos[horas].sum(axis=1, keepdims=True)
+        return pd.DataFrame(
+            100.0 * conteos[horas] / totales,
+            index=pd.Index([f"{h:02d}:00" for h in horas], name="Hora"),
+            columns=list(self.tabla.etiquetas),
+        )
+
+    def minutos_desde(self, nivel_db):
+        """Minutos por nodo en bandas cuyo límite inferior es >= `nivel_db`."""
+        inferiores = np.concatenate([[-np.inf], self.tabla.limites])
+        bandas = np.flatnonzero(inferiores >= nivel_db)
+        return pd.Series(
+            self.segundos[:, bandas, :].sum(axis=(0, 1)) / 60.0,
+            index=pd.Index(self.nodos, name="nodo"),
+        )
+
+
+def distribucion_horaria(df, tabla=RANGOS_DB):
+    """Tabla cruzada (hora × banda × nodo) de la selección en una sola pasada.
+
+    Cada lectura cuenta el tiempo hasta la siguiente del mismo nodo, acotado a
+    dos veces el intervalo típico para que un hueco no se cuente como exposición.
+    """
+    nodos = df["nodo"].astype("category").cat.remove_unused_categories()
+    codigos_nodo = nodos.cat.codes.to_numpy().astype(np.int64)
+    tiempos = df["_time"].dt.as_unit("ns").array.asi8
+    orden = np.lexsort((tiempos, codigos_nodo))
+    codigos_nodo, tiempos = codigos_nodo[orden], tiempos[orden]
+
+    delta = np.diff(tiempos) / 1e9
+    mismo_nodo = codigos_nodo[1:] == codigos_nodo[:-1]
+    tipico = np.median(delta[mismo_nodo]) if mismo_nodo.any() else 0.0
+    duracion = np.zeros(len(tiempos))
+    duracion[:-1] = np.where(mismo_nodo, np.minimum(delta, 2 * tipico), 0.0)
+    # La última lectura de cada nodo cuenta un intervalo típico
+    ultima = np.ones(len(tiempos), dtype=bool)
+    ultima[:-1] = ~mismo_nodo
+    duracion[ultima] = tipico
+
+    horas = df["_time"].dt.hour.to_numpy()[orden].astype(np.int64)
+    bandas = np.digitize(df["_value"].to_numpy()[orden], tabla.limites).astype(np.int64)
+    n_bandas, n_nodos = len(tabla.etiquetas), len(nodos.cat.categories)
+    celda = (horas * n_bandas + bandas) * n_nodos + codigos_nodo
+    forma = (24, n_bandas, n_nodos)
+    return DistribucionHoraria(
+        conteos=np.bincount(celda, minlength=24 * n_bandas * n_nodos).reshape(forma),
+        segundos=np.bincount(celda, weights=duracion, minlength=24 * n_bandas * n_nodos).reshape(forma),
+        tabla=tabla,
+        nodos=[str(n) for n in nodos.cat.categories],
+    )
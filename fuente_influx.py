@@ -0,0 +1,192 @@
+# --- FUENTE DE DATOS: CONSULTA DIRECTA A INFLUXDB ---
+# Consulta la ventana de fecha/hora y los nodos seleccionados. El submuestreo
+# se hace en el servidor con aggregateWindow, con un tamaño de ventana elegido
+# a partir del ancho en píxeles de la gráfica, para no traer millones de
+# puntos crudos a pandas. Los clientes se reutilizan (uno por servidor) y los
+# resultados se cachean por (rango, nodos, ventana); si la ventana llega al
+# presente, la clave incluye además el intervalo de REFRESCO_S en curso para
+# que las lecturas recién escritas aparezcan sin reiniciar la app.
+#
+# Configuración por variables de entorno: INFLUX_URL, INFLUX_TOKEN,
+# INFLUX_ORG, INFLUX_BUCKET, INFLUX_MEASUREMENT e INFLUX_FIELD.
+
+import io
+import os
+import threading
+from dataclasses import dataclass
+
+import pandas as pd
+
+from cache_lru import espacio_cache
+from carga_datos import normalizar
+from influx_csv import leer_csv_anotado
+
+# Ancho por defecto de las gráficas de Resultados (10 in a 100 dpi)
+ANCHO_GRAFICO_PX = 1000
+
+# Ventanas "redondas" que se pueden pedir a aggregateWindow (segundos)
+VENTANAS_S = [1, 5, 10, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 21600, 43200, 86400]
+
+# Segundos que se reutiliza un resultado cuya ventana llega al presente
+REFRESCO_S = int(os.environ.get("RUIDO_INFLUX_REFRESCO_S", "60"))
+
+_cache_consultas = espacio_cache("influx")
+
+_clientes = {}
+_clientes_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ConfigInflux:
+    url: str
+    token: str
+    org: str
+    bucket: str
+    measurement: str = "leq"
+    field: str = "leq"
+
+    @classmethod
+    def desde_entorno(cls):
+        faltantes = [v for v in ("INFLUX_URL", "INFLUX_TOKEN", "INFLUX_ORG", "INFLUX_BUCKET")
+                     if not os.environ.get(v)]
+        if faltantes:
+            raise RuntimeError(f"Faltan variables de entorno para InfluxDB: {', '.join(faltantes)}")
+        return cls(
+            url=os.environ["INFLUX_URL"],
+            token=os.environ["INFLUX_TOKEN"],
+            org=os.environ["INFLUX_ORG"],
+            bucket=os.environ["INFLUX_BUCKET"],
+            measurement=os.environ.get("INFLUX_MEASUREMENT", "leq"),
+            field=os.environ.get("INFLUX_FIELD", "leq"),
+        )
+
+
+def obtener_query_api(config):
+    """QueryApi de un cliente compartido por todas las sesiones."""
+    clave = (config.url, config.org, config.token)
+    with _clientes_lock:
+        cliente = _clientes.get(clave)
+        if cliente is None:
+            from influxdb_client import InfluxDBClient
+            cliente = InfluxDBClient(url=config.url, token=config.token, org=config.org)
+            _clientes[clave] = cliente
+    return cliente.query_api()
+
+
+def cerrar_clientes():
+    with _clientes_lock:
+        for cliente in _clientes.values():
+            cliente.close()
+        _clientes.clear()
+
+
+def ventana_para_ancho(inicio, fin, ancho_px=ANCHO_GRAFICO_PX):
+    """Ventana de agregación (s) que deja a lo más ~1 punto por píxel."""
+    segundos = max((fin - inicio).total_seconds(), 1)
+    minima = segundos / max(int(ancho_px), 1)
+    for ventana in VENTANAS_S:
+        if ventana >= minima:
+            return ventana
+    return VENTANAS_S[-1]
+
+
+def _rfc3339(ts):
+    return pd.Timestamp(ts).tz_convert("UTC").strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def construir_consulta(config, inicio, fin, nodos, ventana_s):
+    lista_nodos = ", ".join(f'"{n}"' for n in nodos)
+    return f'''from(bucket: "{config.bucket}")
+  |> range(start: {_rfc3339(inicio)}, stop: {_rfc3339(fin)})
+  |> filter(fn: (r) => r._measurement == "{config.measurement}" and r._field == "{config.field}")
+  |> filter(fn: (r) => contains(value: r.nodo, set: [{lista_nodos}]))
+  |> aggregateWindow(every: {int(ventana_s)}s, fn: mean, createEmpty: false)
+  |> keep(columns: ["_time", "_value", "nodo"])'''
+
+
+def consultar_nodos(config, query_api=None):
+    """Lista de valores del tag `nodo` presentes en el bucket."""
+    clave = ("nodos", config.url, config.bucket, config.measurement)
+
+    def calcular():
+        api = query_api or obtener_query_api(config)
+        flux = f'''import "influxdata/influxdb/schema"
+schema.tagValues(bucket: "{config.bucket}", tag: "nodo",
+  predicate: (r) => r._measurement == "{config.measurement}")'''
+        valores = leer_csv_anotado(api.query_raw(flux, org=config.org), columnas=("_value",))
+        nodos = [str(v) for v in valores["_value"]]
+        try:
+            return sorted(nodos, key=int)
+        except ValueError:
+            return sorted(nodos)
+
+    return _cache_consultas.obtener_o_calcular(clave, calcular)
+
+
+def version_influx(config, fin, ahora=None):
+    """Versión de los datos de Influx para una ventana que termina en `fin`.
+
+    Una ventana pasada ya no cambia; si `fin` cae dentro de los últimos
+    REFRESCO_S segundos o en el futuro, la versión incluye el intervalo de
+    REFRESCO_S en curso y caduca sola.
+    """
+    ahora = pd.Timestamp.now(tz="UTC") if ahora is None else ahora
+    version = ("influx", config.url, config.bucket)
+    if pd.Timestamp(fin) >= ahora - pd.Timedelta(seconds=REFRESCO_S):
+        version += (ahora.value // (REFRESCO_S * 10**9),)
+    return version
+
+
+def consultar_resultados(config, inicio, fin, nodos, ancho_px=ANCHO_GRAFICO_PX, query_api=None):
+    """DataFrame normalizado (igual que `cargar_resultados`) para la ventana pedida.
+
+    El resultado se comparte entre sesiones: no debe modificarse en sitio.
+    """
+    nodos = tuple(sorted(str(n) for n in nodos))
+    ventana = ventana_para_ancho(inicio, fin, ancho_px)
+    clave = version_influx(config, fin) + (_rfc3339(inicio), _rfc3339(fin), nodos, ventana)
+
+    def calcular():
+        api = query_api or obtener_query_api(config)
+        flux = construir_consulta(config, inicio, fin, nodos, ventana)
+        crudo = leer_csv_anotado(api.query_raw(flux, org=config.org))
+        if crudo.empty:
+            return crudo
+        return normalizar(crudo)
+
+    return _cache_consultas.obtener_o_calcular(clave, calcular)
+
+
+def consultar_nuevos(config, desde, query_api=None):
+    """Lecturas crudas con `_time` >= `desde`, sin agregar ni cachear (modo en vivo)."""
+    api = query_api or obtener_query_api(config)
+    inicio = pd.Timestamp(desde).tz_convert("UTC").strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    flux = f'''from(bucket: "{config.bucket}")
+  |> range(start: {inicio})
+  |> filter(fn: (r) => r._measurement == "{config.measurement}" and r._field == "{config.field}")
+  |> keep(columns: ["_time", "_value", "nodo"])'''
+    return leer_csv_anotado(api.query_raw(flux, org=config.org))
+
+
+class ConsultaGrabada:
+    """Sustituto local de QueryApi que responde con CSV anotados grabados.
+
+    `respuestas` es una ruta (se usa para cualquier consulta) o una función
+    que recibe el texto Flux y devuelve la ruta o el texto a responder. Las
+    consultas recibidas quedan en `consultas` para poder inspeccionarlas.
+    """
+
+    def __init__(self, respuestas):
+        self.respuestas = respuestas
+        self.consultas = []
+
+    def query_raw(self, query, org=None, **kwargs):
+        self.consultas.append(query)
+        respuesta = self.respuestas(query) if callable(self.respuestas) else self.respuestas
+        if "\n" not in respuesta:
+            with open(respuesta, "rb") as f:
+                respuesta = f.read()
+        else:
+            respuesta = respuesta.encode("utf-8")
+        return io.BytesIO(respuesta)
+
@@ -0,0 +1,74 @@
+# --- ÍNDICE POR (NODO, TIEMPO) PARA RECORTAR VENTANAS ---
+# El DataFrame cargado está ordenado por (nodo, _time). Con un arreglo de
+# desplazamientos por nodo, una ventana de fecha/hora se resuelve con dos
+# búsquedas binarias (searchsorted) por nodo seleccionado y el costo del filtro
+# depende del tamaño del resultado, no del de todo el archivo. Las listas de
+# fechas y nodos del sidebar también se calculan una sola vez aquí.
+
+import numpy as np
+import pandas as pd
+
+from cache_lru import espacio_cache
+
+_cache_indices = espacio_cache("indices")
+
+
+class IndiceLecturas:
+    """Índice de solo lectura sobre un DataFrame ordenado por (nodo, _time).
+
+    No guarda el DataFrame (que vive en la caché de carga_datos): cada
+    consulta recibe el mismo `df` con el que se construyó.
+    """
+
+    def __init__(self, df):
+        self.nodos = [str(n) for n in df["nodo"].cat.categories]
+        self._posicion_nodo = {n: i for i, n in enumerate(self.nodos)}
+        codigos = df["nodo"].cat.codes.to_numpy()
+        self.offsets = np.searchsorted(codigos, np.arange(len(self.nodos) + 1))
+        tiempos = df["_time"]
+        self.fecha_min = tiempos.min().date() if len(df) else None
+        self.fecha_max = tiempos.max().date() if len(df) else None
+
+    @property
+    def nbytes(self):
+        return int(self.offsets.nbytes)
+
+    def rangos(self, df, inicio, fin, nodos):
+        """[(desde, hasta)] de posiciones en `df` para cada nodo seleccionado."""
+        # Vista (sin copia) de los tiempos como enteros ns UTC
+        tiempos = df["_time"].array.asi8
+        t_ini = pd.Timestamp(inicio).as_unit("ns").value
+        t_fin = pd.Timestamp(fin).as_unit("ns").value
+        rangos = []
+        for nodo in nodos:
+            i = self._posicion_nodo.get(str(nodo))
+            if i is None:
+                continue
+            lo, hi = self.offsets[i], self.offsets[i + 1]
+            tramo = tiempos[lo:hi]
+            desde = lo + np.searchsorted(tramo, t_ini, side="left")
+            hasta = lo + np.searchsorted(tramo, t_fin, side="right")
+            if hasta > desde:
+                rangos.append((int(desde), int(hasta)))
+        return rangos
+
+    def ventana(self, df, inicio, fin, nodos):
+        """Filas de `df` en [inicio, fin] de `nodos`; el índice conserva las posiciones."""
+        rangos = self.rangos(df, inicio, fin, nodos)
+        if not rangos:
+            return df.iloc[0:0].copy(deep=False)
+        if len(rangos) == 1 or all(a[1] == b[0] for a, b in zip(rangos, rangos[1:])):
+            # Un solo tramo contiguo: rebanada sin copiar los datos
+            return df.iloc[rangos[0][0]:rangos[-1][1]].copy(deep=False)
+        posiciones = np.concatenate([np.arange(a, b) for a, b in rangos])
+        return df.take(posiciones)
+
+
+def indice_para(df, clave=None):
+    """Índice del DataFrame cargado, compartido entre sesiones por versión de archivo.
+
+    Sin `clave` no hay con qué distinguir un DataFrame de otro: no se cachea.
+    """
+    if clave is None:
+        return IndiceLecturas(df)
+    return _cache_indices.obtener_o_calcular(("indice", clave), lambda: IndiceLecturas(df))
@@ -0,0 +1,193 @@
+# --- LECTOR DE CSV ANOTADO DE INFLUXDB ---
+# Formato que exporta InfluxDB (ver 40nodos.csv): cada tabla empieza con las
+# filas de anotación #group / #datatype / #default, seguidas del encabezado y
+# los datos; las tablas con esquema distinto se separan con una línea vacía.
+# El archivo se recorre una sola vez, en trozos de tamaño fijo: las filas de
+# datos de cada trozo se convierten directo a columnas tipadas (los tipos se
+# toman de la fila #datatype, sin pasar por `dtype=str`), así que la memoria
+# pico es la del resultado más un trozo, no la del texto completo.
+
+import codecs
+import io
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Columnas que usa la sección de Resultados; el resto (result, table, _start,
+# _stop, _field, _measurement) no se llega a materializar.
+COLUMNAS_UTILES = ("_time", "nodo", "_value")
+
+# Nombres alternativos que aparecen en exportaciones hechas a mano
+ALIAS = {"time": "_time", "value": "_value", "node": "nodo"}
+
+# Caracteres por lectura del archivo
+TAMANO_TROZO = 8 * 1024 * 1024
+
+TIPOS_INFLUX = {
+    "double": "float64",
+    "long": "int64",
+    "unsignedLong": "uint64",
+    "boolean": "bool",
+    "string": "category",
+}
+
+
+def es_csv_anotado(ruta):
+    """True si el archivo empieza con filas de anotación de InfluxDB."""
+    with open(ruta, "r", encoding="utf-8-sig") as f:
+        return f.read(1) == "#"
+
+
+def normalizar_nombre(nombre):
+    nombre = nombre.strip().replace("\ufeff", "")
+    return ALIAS.get(nombre.lower(), nombre)
+
+
+def _leer_trozos(fuente, tamano):
+    """Trozos de texto de una ruta, un archivo abierto (texto o binario) o un str."""
+    if isinstance(fuente, str) and "\n" in fuente:
+        for inicio in range(0, len(fuente), tamano):
+            yield fuente[inicio:inicio + tamano]
+    elif hasattr(fuente, "read"):
+        # Las respuestas de query_raw son binarias
+        decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+        while True:
+            trozo = fuente.read(tamano)
+            texto = decodificador.decode(trozo, final=not trozo) if isinstance(trozo, bytes) else trozo
+            if texto:
+                yield texto
+            if not trozo:
+                return
+    else:
+        with open(fuente, "r", encoding="utf-8-sig") as f:
+            yield from _leer_trozos(f, tamano)
+
+
+def _trozos(fuente, tamano):
+    """Trozos de texto con los finales de línea \\r\\n convertidos a \\n."""
+    resto = ""
+    for trozo in _leer_trozos(fuente, tamano):
+        trozo = resto + trozo
+        # Un \r al final puede ser la mitad de un \r\n partido entre trozos
+        resto = "\r" if trozo.endswith("\r") else ""
+        if resto:
+            trozo = trozo[:-1]
+        yield trozo.replace("\r\n", "\n") if "\r" in trozo else trozo
+    if resto:
+        yield "\n"
+
+
+class _Esquema:
+    """Encabezado de la tabla en curso: nombres, columnas útiles y tipos."""
+
+    def __init__(self, anotaciones, encabezado, columnas):
+        self.nombres = [normalizar_nombre(c) for c in encabezado.split(",")]
+        self.columnas = columnas
+        self.util = all(c in self.nombres for c in columnas)
+        if not self.util:
+            # Tablas de error u otros esquemas que no nos interesan
+            return
+
+        tipos_anotados = anotaciones.get("#datatype", [])
+        # La primera columna del encabezado corresponde a la de anotaciones
+        if len(tipos_anotados) == len(self.nombres) - 1:
+            tipos_anotados = [""] + tipos_anotados
+
+        self.dtype, self.fechas = {}, []
+        for nombre, tipo in zip(self.nombres, tipos_anotados):
+            if nombre not in columnas:
+                continue
+            if tipo.startswith("dateTime"):
+                self.fechas.append(nombre)
+            elif tipo in TIPOS_INFLUX:
+                self.dtype[nombre] = TIPOS_INFLUX[tipo]
+        self.indices = [self.nombres.index(c) for c in columnas]
+
+    def leer(self, texto):
+        """Filas de datos (texto de líneas completas) como DataFrame tipado."""
+        datos = pd.read_csv(
+            io.StringIO(texto),
+            header=None,
+            names=self.nombres,
+            usecols=self.indices,
+            dtype=self.dtype,
+            engine="c",
+        )
+        for nombre in self.fechas:
+            datos[nombre] = pd.to_datetime(
+                datos[nombre], utc=True, format="ISO8601"
+            ).astype("datetime64[ns, UTC]")
+        return datos[list(self.columnas)]
+
+
+def _tablas(trozos, columnas):
+    """Recorre los trozos y produce un DataFrame por cada tramo de datos.
+
+    Solo se conserva en memoria el trozo actual (más la línea partida al
+    final): las filas de datos se convierten a columnas tipadas trozo a
+    trozo, y una línea vacía cierra la tabla en curso.
+    """
+    anotaciones, esquema, pendiente = {}, None, ""
+    for trozo in trozos:
+        texto = pendiente + trozo
+        pos, n = 0, len(texto)
+        while pos < n:
+            if esquema is None:
+                salto = texto.find("\n", pos)
+                if salto == -1:
+                    break
+                linea = texto[pos:salto].lstrip("\ufeff")
+                pos = salto + 1
+                if not linea:
+                    continue
+                if linea[0] == "#":
+                    campos = linea.split(",")
+                    anotaciones[campos[0]] = campos[1:]
+                else:
+                    esquema = _Esquema(anotaciones, linea, columnas)
+                continue
+
+            if texto[pos] == "\n":
+                # Línea vacía: termina la tabla
+                anotaciones, esquema = {}, None
+                pos += 1
+                continue
+            fin = texto.find("\n\n", pos)
+            if fin == -1:
+                fin = texto.rfind("\n", pos)
+                if fin == -1:
+                    break
+            if esquema.util:
+                yield esquema.leer(texto[pos:fin + 1])
+            pos = fin + 1
+        pendiente = texto[pos:]
+
+    if pendiente.strip() and esquema is not None and esquema.util:
+        yield esquema.leer(pendiente + "\n")
+
+
+def _concatenar(tablas):
+    if len(tablas) == 1:
+        return tablas[0]
+    resultado = pd.concat(tablas, ignore_index=True)
+    # pd.concat pierde la categoría si cada tabla trae categorías distintas
+    for col in tablas[0].columns:
+        if all(isinstance(t[col].dtype, pd.CategoricalDtype) for t in tablas):
+            resultado[col] = union_categoricals([t[col] for t in tablas])
+    return resultado
+
+
+def leer_csv_anotado(fuente, columnas=COLUMNAS_UTILES, tamano_trozo=TAMANO_TROZO):
+    """Lee un CSV anotado de InfluxDB (ruta, archivo abierto, bytes o texto).
+
+    Devuelve un DataFrame con solo `columnas`, tipado según #datatype. Las
+    columnas dateTime:RFC3339 quedan como datetime64[ns, UTC]. La entrada se
+    lee en trozos de `tamano_trozo` caracteres, acepta finales \\r\\n y no
+    se copia completa a memoria.
+    """
+    if isinstance(fuente, bytes):
+        fuente = io.BytesIO(fuente)
+    tablas = [t for t in _tablas(_trozos(fuente, tamano_trozo), columnas) if not t.empty]
+    if not tablas:
+        return pd.DataFrame({c: pd.Series(dtype=object) for c in columnas})
+    return _concatenar(tablas)
@@ -0,0 +1,146 @@
+# --- MOTOR DEL MAPA DE CALOR (TAB 1) ---
+# Las muestras se agrupan en una matriz (intervalo de tiempo × nodo) con un
+# np.bincount vectorizado; el tamaño del intervalo sale de la resolución
+# pedida. Las celdas vacías entre dos lecturas del mismo nodo se interpolan
+# (1-D, a lo largo del tiempo), salvo las que caen dentro de un hueco de
+# datos (ver calidad_datos.py): esas quedan en NaN y se dibujan en blanco,
+# para que una caída del sensor no se pinte como nivel medido. La matriz se
+# dibuja con un único imshow, en lugar de triangular los puntos con griddata.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from calidad_datos import evaluar_calidad
+from carga_datos import ZONA_HORARIA
+from fuente_influx import ventana_para_ancho
+
+# Filas de tiempo del mapa (≈ alto en píxeles de la figura de 6 in)
+RESOLUCION_DEFAULT = 600
+
+
+@dataclass
+class MatrizCalor:
+    valores: np.ndarray  # (intervalos, nodos), NaN donde no hay dato
+    nodos: list
+    inicio: pd.Timestamp  # inicio del primer intervalo
+    paso_s: int
+
+    @property
+    def nbytes(self):
+        return int(self.valores.nbytes)
+
+    @property
+    def tiempos(self):
+        """Inicio de cada intervalo (hora local)."""
+        return self.inicio + pd.to_timedelta(np.arange(self.valores.shape[0]) * self.paso_s, unit="s")
+
+
+def _interpolar_vacias(matriz):
+    """Interpola en el tiempo las celdas vacías interiores de cada columna (en sitio)."""
+    filas = np.arange(matriz.shape[0])
+    for j in np.flatnonzero(np.isnan(matriz).any(axis=0)):
+        columna = matriz[:, j]
+        observadas = np.flatnonzero(~np.isnan(columna))
+        if len(observadas) < 2:
+            continue
+        interior = filas[observadas[0]:observadas[-1] + 1]
+        huecos = interior[np.isnan(columna[interior])]
+        if len(huecos):
+            columna[huecos] = np.interp(huecos, observadas, columna[observadas])
+    return matriz
+
+
+def _enmascarar_huecos(matriz, huecos, nodos, t0, paso_ns):
+    """Deja en NaN (en sitio) las celdas que caen por completo dentro de un hueco."""
+    columnas = pd.Index(nodos).get_indexer(huecos["nodo"].astype(str))
+    en_matriz = columnas >= 0
+    n_filas = matriz.shape[0]
+    # La lectura previa al hueco cae en la celda `desde - 1` y la siguiente en `hasta`
+    desde = np.clip((huecos["inicio"].array.asi8[en_matriz] - t0) // paso_ns + 1, 0, n_filas)
+    hasta = np.clip((huecos["fin"].array.asi8[en_matriz] - t0) // paso_ns, 0, n_filas)
+    columnas = columnas[en_matriz]
+    validos = hasta > desde
+    if not validos.any():
+        return matriz
+
+    # Marcas +1/−1 por columna y suma acumulada: filas cubiertas por algún hueco
+    marcas = np.zeros((n_filas + 1, matriz.shape[1]), dtype=np.int32)
+    np.add.at(marcas, (desde[validos], columnas[validos]), 1)
+    np.add.at(marcas, (hasta[validos], columnas[validos]), -1)
+    matriz[np.cumsum(marcas, axis=0)[:-1] > 0] = np.nan
+    return matriz
+
+
+def construir_matriz(df, resolucion=RESOLUCION_DEFAULT, huecos=None):
+    """Matriz intervalo × nodo con la media de `_value` de cada celda.
+
+    `huecos` es la tabla de CalidadDatos del archivo; si no se da, se
+    detectan sobre `df`.
+    """
+    if df.empty:
+        return None
+
+    tiempos = df["_time"].dt.tz_convert("UTC").dt.as_unit("ns").array.asi8
+    t_min, t_max = tiempos.min(), tiempos.max()
+    paso_s = ventana_para_ancho(pd.Timestamp(t_min), pd.Timestamp(t_max), resolucion)
+    paso_ns = paso_s * 1_000_000_000
+    t0 = (t_min // paso_ns) * paso_ns
+    filas = (tiempos - t0) // paso_ns
+    n_filas = int(filas.max()) + 1
+
+    # Solo las columnas de nodos presentes, en el orden de la categoría
+    nodos = df["nodo"].astype("category")
+    codigos = nodos.cat.codes.to_numpy()
+    presentes = np.unique(codigos)
+    columna_de = np.full(len(nodos.cat.categories), -1, dtype=np.int64)
+    columna_de[presentes] = np.arange(len(presentes))
+    columnas = columna_de[codigos]
+    n_nodos = len(presentes)
+
+    celda = filas * n_nodos + columnas
+    tamano = n_filas * n_nodos
+    suma = np.bincount(celda, weights=df["_value"].to_numpy(dtype=np.float64), minlength=tamano)
+    cuenta = np.bincount(celda, minlength=tamano)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valores = (suma / cuenta).astype(np.float32).reshape(n_filas, n_nodos)
+
+    nombres = [str(n) for n in nodos.cat.categories[presentes]]
+    if huecos is None:
+        huecos = evaluar_calidad(df).huecos
+    valores = _enmascarar_huecos(_interpolar_vacias(valores), huecos, nombres, t0, paso_ns)
+
+    return MatrizCalor(
+        valores=valores,
+        nodos=nombres,
+        inicio=pd.Timestamp(t0, tz="UTC").tz_convert(ZONA_HORARIA),
+        paso_s=paso_s,
+    )
+
+
+def dibujar_matriz(matriz, cmap="jet"):
+    """Figura de matplotlib con el mapa de calor (celdas sin dato en blanco)."""
+    import matplotlib.pyplot as plt
+
+    n_filas, n_nodos = matriz.valores.shape
+    fig, ax = plt.subplots(figsize=(10, 6))
+    imagen = ax.imshow(
+        np.ma.masked_invalid(matriz.valores),
+        cmap=cmap,
+        aspect="auto",
+        origin="lower",
+        interpolation="nearest",
+    )
+
+    ax.set_xticks(np.arange(n_nodos))
+    ax.set_xticklabels(matriz.nodos, rotation=90 if n_nodos > 20 else 0)
+    yticks_indices = np.linspace(0, n_filas - 1, num=min(10, n_filas), dtype=int)
+    ax.set_yticks(yticks_indices)
+    ax.set_yticklabels(matriz.tiempos[yticks_indices].strftime('%H:%M'), rotation=0)
+    ax.set_xlabel("Nodos")
+    ax.set_ylabel("Hora (HH:MM)")
+
+    cbar = fig.colorbar(imagen, ax=ax)
+    cbar.set_label('Nivel de sonido (dB)', rotation=270, labelpad=20)
+    return fig
@@ -0,0 +1,158 @@
+# --- MAPA ESPACIAL DEL CAMPUS (TAB 1) ---
+# Con la posición de cada nodo (coordenadas_nodos.csv: nodo, x, y en metros o
+# nodo, lat, lon) los niveles se interpolan sobre una rejilla del campus por
+# distancia inversa (IDW). Los pesos rejilla × nodo solo dependen de la
+# disposición de los nodos, así que se calculan una vez y se cachean; cada
+# cuadro (un instante o el promedio de la ventana) es un producto
+# matriz–vector sobre una fila de la MatrizCalor del mapa de nodo × tiempo.
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from cache_lru import espacio_cache
+from carga_datos import ErrorDatos
+
+RUTA_COORDENADAS = os.environ.get("RUIDO_COORDENADAS", "coordenadas_nodos.csv")
+
+# Celdas de la rejilla en el lado más largo y exponente de la distancia
+RESOLUCION_MAPA = 200
+POTENCIA_IDW = 2.0
+# Margen alrededor de los nodos (fracción del tamaño del campus)
+MARGEN = 0.05
+
+# Metros por grado de latitud y de longitud en el ecuador
+_M_POR_GRADO_LAT = 110_540.0
+_M_POR_GRADO_LON = 111_320.0
+
+_cache_operadores = espacio_cache("operadores_idw")
+
+
+def cargar_coordenadas(ruta=RUTA_COORDENADAS):
+    """DataFrame (índice nodo) con columnas x, y en metros; None si no hay archivo."""
+    if not os.path.exists(ruta):
+        return None
+    tabla = pd.read_csv(ruta)
+    tabla.columns = [c.strip().lower() for c in tabla.columns]
+    if "nodo" not in tabla.columns:
+        raise ErrorDatos(f"'{ruta}' debe tener una columna 'nodo'.")
+
+    if {"x", "y"} <= set(tabla.columns):
+        x, y = tabla["x"].astype(float), tabla["y"].astype(float)
+    elif {"lat", "lon"} <= set(tabla.columns):
+        # Proyección equirectangular local: suficiente a la escala de un campus
+        lat, lon = tabla["lat"].astype(float), tabla["lon"].astype(float)
+        lat0 = lat.mean()
+        x = (lon - lon.mean()) * _M_POR_GRADO_LON * np.cos(np.radians(lat0))
+        y = (lat - lat0) * _M_POR_GRADO_LAT
+    else:
+        raise ErrorDatos(f"'{ruta}' debe tener columnas 'x, y' o 'lat, lon'.")
+
+    return pd.DataFrame(
+        {"x": x.to_numpy(), "y": y.to_numpy()},
+        index=pd.Index(tabla["nodo"].astype(str).str.strip(), name="nodo"),
+    )
+
+
+@dataclass
+class OperadorIDW:
+    pesos: np.ndarray  # (celdas, nodos), sin normalizar
+    nodos: list
+    extension: tuple  # (x_min, x_max, y_min, y_max)
+    forma: tuple  # (alto, ancho)
+
+    @property
+    def nbytes(self):
+        return int(self.pesos.nbytes)
+
+    def interpolar(self, niveles):
+        """Rejilla (alto, ancho) para un nivel por nodo; los NaN no participan."""
+        niveles = np.asarray(niveles, dtype=np.float32)
+        validos = ~np.isnan(niveles)
+        # Numerador y denominador en un solo producto: los pesos se renormalizan
+        # sobre los nodos con dato en este cuadro
+        columnas = np.stack([np.where(validos, niveles, 0.0), validos], axis=1).astype(np.float32)
+        numerador, denominador = (self.pesos @ columnas).T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (numerador / denominador).reshape(self.forma)
+
+
+def construir_operador(coordenadas, nodos, resolucion=RESOLUCION_MAPA, potencia=POTENCIA_IDW):
+    """Pesos IDW de cada celda de la rejilla para las columnas `nodos`.
+
+    Los nodos sin coordenadas quedan con peso cero (no aparecen en el mapa).
+    """
+    con_posicion = [n for n in nodos if n in coordenadas.index]
+    if len(con_posicion) < 2:
+        return None
+    puntos = coordenadas.loc[con_posicion, ["x", "y"]].to_numpy(dtype=np.float64)
+
+    x_min, y_min = puntos.min(axis=0)
+    x_max, y_max = puntos.max(axis=0)
+    margen = MARGEN * max(x_max - x_min, y_max - y_min, 1.0)
+    x_min, x_max, y_min, y_max = x_min - margen, x_max + margen, y_min - margen, y_max + margen
+    paso = max(x_max - x_min, y_max - y_min) / resolucion
+    ancho = max(int(np.ceil((x_max - x_min) / paso)), 1)
+    alto = max(int(np.ceil((y_max - y_min) / paso)), 1)
+
+    cx = x_min + (np.arange(ancho) + 0.5) * paso
+    cy = y_min + (np.arange(alto) + 0.5) * paso
+    gx, gy = np.meshgrid(cx, cy)
+    distancias = np.hypot(gx.reshape(-1, 1) - puntos[:, 0], gy.reshape(-1, 1) - puntos[:, 1])
+    # Media celda como distancia mínima: la celda de un nodo toma su nivel
+    pesos_nodos = np.power(np.maximum(distancias, paso / 2), -potencia)
+
+    pesos = np.zeros((alto * ancho, len(nodos)), dtype=np.float32)
+    columna = {n: i for i, n in enumerate(nodos)}
+    pesos[:, [columna[n] for n in con_posicion]] = pesos_nodos
+    return OperadorIDW(
+        pesos=pesos,
+        nodos=list(nodos),
+        extension=(x_min, x_min + ancho * paso, y_min, y_min + alto * paso),
+        forma=(alto, ancho),
+    )
+
+
+def operador_para(coordenadas, nodos, resolucion=RESOLUCION_MAPA, potencia=POTENCIA_IDW):
+    """Operador cacheado por disposición de nodos (coordenadas y columnas)."""
+    presentes = coordenadas.reindex(nodos)
+    clave = (tuple(nodos), presentes.to_numpy().tobytes(), resolucion, potencia)
+    return _cache_operadores.obtener_o_calcular(
+        clave, lambda: construir_operador(coordenadas, nodos, resolucion, potencia)
+    )
+
+
+def niveles_promedio(valores):
+    """Promedio energético por columna de una matriz (intervalos, nodos) con NaN."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        energia = np.nanmean(np.power(10.0, np.asarray(valores, dtype=np.float64) / 10.0), axis=0)
+        return (10.0 * np.log10(energia)).astype(np.float32)
+
+
+def dibujar_mapa(operador, cuadro, coordenadas, cmap="jet", vmin=None, vmax=None):
+    """Figura de matplotlib con el mapa interpolado y la posición de los nodos."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 8 * operador.forma[0] / operador.forma[1]))
+    imagen = ax.imshow(
+        np.ma.masked_invalid(cuadro),
+        cmap=cmap,
+        origin="lower",
+        extent=operador.extension,
+        vmin=vmin,
+        vmax=vmax,
+        interpolation="bilinear",
+    )
+    puntos = coordenadas.reindex(operador.nodos).dropna()
+    ax.scatter(puntos["x"], puntos["y"], c="black", s=12)
+    for nodo, (x, y) in puntos.iterrows():
+        ax.annotate(nodo, (x, y), xytext=(3, 3), textcoords="offset points", fontsize=7)
+    ax.set_xlabel("x (m)")
+    ax.set_ylabel("y (m)")
+    ax.set_aspect("equal")
+
+    cbar = fig.colorbar(imagen, ax=ax)
+    cbar.set_label('Nivel de sonido (dB)', rotation=270, labelpad=20)
+    return fig
@@ -0,0 +1,162 @@
+# --- INSTRUMENTACIÓN DE RENDIMIENTO ---
+# Temporizadores con nombre para cada etapa de la sección de Resultados:
+# duración, filas procesadas y cambio de memoria residente (RSS). Cada rerun
+# se guarda en un historial compartido del proceso para calcular p50/p95, y
+# opcionalmente se exporta a un archivo JSON lines (RUIDO_PERFIL_LOG) o como
+# texto de Prometheus en un puerto propio (RUIDO_METRICAS_PUERTO, solo en
+# 127.0.0.1 salvo que RUIDO_METRICAS_HOST diga otra cosa).
+
+import json
+import os
+import threading
+import time
+import warnings
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Reruns que se conservan por etapa para los percentiles
+HISTORIAL_MAX = 500
+
+_historial = defaultdict(lambda: deque(maxlen=HISTORIAL_MAX))
+_historial_lock = threading.Lock()
+_servidor = None
+_error_servidor = None
+
+
+def memoria_rss():
+    """Memoria residente del proceso en bytes (None si no se puede leer)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Etapa:
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.segundos = 0.0
+        self.filas = None
+        self.delta_bytes = None
+
+
+class Perfilador:
+    """Mide las etapas de un rerun; `finalizar` lo agrega al historial."""
+
+    def __init__(self):
+        self.etapas = []
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nombre, filas=None):
+        registro = Etapa(nombre)
+        registro.filas = filas
+        rss_antes = memoria_rss()
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro.segundos = time.perf_counter() - inicio
+            rss_despues = memoria_rss()
+            if rss_antes is not None and rss_despues is not None:
+                registro.delta_bytes = rss_despues - rss_antes
+            self.etapas.append(registro)
+
+    def finalizar(self):
+        total = time.perf_counter() - self._inicio
+        with _historial_lock:
+            for registro in self.etapas:
+                _historial[registro.nombre].append(registro.segundos)
+            _historial["total"].append(total)
+
+        ruta_log = os.environ.get("RUIDO_PERFIL_LOG")
+        if ruta_log:
+            linea = {
+                "ts": time.time(),
+                "total_s": round(total, 6),
+                "etapas": [
+                    {"nombre": r.nombre, "s": round(r.segundos, 6), "filas": r.filas, "delta_bytes": r.delta_bytes}
+                    for r in self.etapas
+                ],
+            }
+            with open(ruta_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(linea) + "\n")
+        return total
+
+    def tabla(self):
+        """Filas para mostrar el último rerun en un st.dataframe."""
+        return [
+            {
+                "Etapa": r.nombre,
+                "ms": round(r.segundos * 1000, 2),
+                "Filas": r.filas,
+                "Δ memoria (MB)": None if r.delta_bytes is None else round(r.delta_bytes / 2**20, 2),
+            }
+            for r in self.etapas
+        ]
+
+
+def percentiles():
+    """{etapa: (n, p50_s, p95_s)} sobre el historial del proceso."""
+    with _historial_lock:
+        copia = {nombre: np.fromiter(valores, dtype=float) for nombre, valores in _historial.items()}
+    return {
+        nombre: (len(v), float(np.percentile(v, 50)), float(np.percentile(v, 95)))
+        for nombre, v in copia.items() if len(v)
+    }
+
+
+def texto_prometheus():
+    """Métricas en formato de exposición de texto de Prometheus."""
+    lineas = [
+        "# HELP ruido_etapa_segundos Latencia por etapa de la sección de Resultados.",
+        "# TYPE ruido_etapa_segundos summary",
+    ]
+    for nombre, (n, p50, p95) in sorted(percentiles().items()):
+        lineas.append(f'ruido_etapa_segundos{{etapa="{nombre}",quantile="0.5"}} {p50:.6f}')
+        lineas.append(f'ruido_etapa_segundos{{etapa="{nombre}",quantile="0.95"}} {p95:.6f}')
+        lineas.append(f'ruido_etapa_segundos_count{{etapa="{nombre}"}} {n}')
+    return "\n".join(lineas) + "\n"
+
+
+class _ManejadorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        cuerpo = texto_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_servidor_metricas(puerto=None, host=None):
+    """Sirve /metrics en segundo plano (una sola vez por proceso).
+
+    Por defecto solo escucha en 127.0.0.1 (RUIDO_METRICAS_HOST para otra
+    interfaz). Si el puerto está ocupado, p. ej. por otro proceso de la app,
+    se avisa una vez y la app sigue sin métricas.
+    """
+    global _servidor, _error_servidor
+    puerto = puerto or os.environ.get("RUIDO_METRICAS_PUERTO")
+    host = host or os.environ.get("RUIDO_METRICAS_HOST", "127.0.0.1")
+    if not puerto:
+        return None
+    with _historial_lock:
+        if _servidor is None and _error_servidor is None:
+            try:
+                _servidor = ThreadingHTTPServer((host, int(puerto)), _ManejadorMetricas)
+            except OSError as exc:
+                _error_servidor = exc
+                warnings.warn(f"No se pudo servir /metrics en {host}:{puerto}: {exc}", RuntimeWarning)
+                return None
+            threading.Thread(target=_servidor.serve_forever, daemon=True).start()
+    return _servidor
@@ -0,0 +1,81 @@
+# --- PIPELINE DE RESULTADOS (SIN STREAMLIT) ---
+# Las etapas numéricas de la sección de Resultados como funciones puras:
+# ventana de fecha/hora → selección → series, estadísticos, distribución
+# horaria y clasificación de riesgo. La usan app.py y reporte_resultados.py.
+# `base`/`clave` son el DataFrame cargado completo y su versión; si se dan,
+# los artefactos por archivo (pirámide, parciales, clasificación) se reutilizan.
+
+import pandas as pd
+
+from acustica import parciales_para, parciales_ventana
+from agregados import piramide_para
+from carga_datos import ZONA_HORARIA
+from clasificacion import RIESGO_AUDITIVO, agregar_clasificacion
+from fuente_influx import ANCHO_GRAFICO_PX
+from indice_lecturas import indice_para
+
+# Niveles (dB) para la tabla de tiempo de exposición
+NIVELES_EXPOSICION = (85, 100)
+
+
+def ventana_local(fecha, hora_inicio="00:00", hora_fin="23:59"):
+    """(inicio, fin) en hora de México para una fecha y un rango de horas."""
+    inicio = pd.to_datetime(f"{fecha} {hora_inicio}").tz_localize(ZONA_HORARIA)
+    fin = pd.to_datetime(f"{fecha} {hora_fin}").tz_localize(ZONA_HORARIA)
+    return inicio, fin
+
+
+def seleccionar(df, inicio, fin, nodos=None, clave=None):
+    """Lecturas de `nodos` (todos si es None) entre `inicio` y `fin`."""
+    indice = indice_para(df, clave)
+    return indice.ventana(df, inicio, fin, indice.nodos if nodos is None else nodos)
+
+
+def calcular_series(df_filtrado, base=None, clave=None, ancho_px=ANCHO_GRAFICO_PX):
+    """(nodos, paso_s, series) para las gráficas de línea, según el ancho."""
+    piramide = piramide_para(base if clave is not None else df_filtrado, clave)
+    nodos = [
+        str(n) for n in df_filtrado["nodo"].astype("category").cat.remove_unused_categories().cat.categories
+    ]
+    paso, series = piramide.consultar(
+        df_filtrado["_time"].min(), df_filtrado["_time"].max(), nodos, ancho_px, seleccion=df_filtrado
+    )
+    return nodos, paso, series
+
+
+def pivote_maximos(series):
+    """Máximo de cada intervalo con una columna por nodo.
+
+    En ventanas cortas las series son lecturas crudas, que pueden repetir
+    (nodo, _time): se queda el máximo de las repetidas.
+    """
+    pivote = series.pivot_table(
+        index="_time", columns="nodo", values="maximo", aggfunc="max", observed=True
+    ).sort_index()
+    pivote.columns = pivote.columns.astype(str)
+    return pivote
+
+
+def calcular_estadisticos(df_filtrado, base=None, clave=None):
+    """(resumen por nodo, Leq por hora y nodo) de la selección."""
+    parciales_base = parciales_para(base, clave) if clave is not None else None
+    parciales_seleccion = parciales_ventana(df_filtrado, parciales_base)
+
+    resumen = parciales_seleccion.combinar(["nodo"]).estadisticos().set_index("nodo").round(2)
+    horario = parciales_seleccion.combinar(["hora", "nodo"]).estadisticos()
+    horario["hora"] = horario["hora"].dt.strftime("%Y-%m-%d %H:00")
+    return resumen, horario.pivot(index="hora", columns="nodo", values="Leq").round(2)
+
+
+def tabla_exposicion(distribucion, niveles=NIVELES_EXPOSICION):
+    """Minutos por nodo en o por encima de cada nivel."""
+    return pd.DataFrame({
+        f"Minutos ≥ {nivel} dB": distribucion.minutos_desde(nivel) for nivel in niveles
+    }).round(1)
+
+
+def riesgo_por_nodo(df_filtrado, criterio=RIESGO_AUDITIVO, base=None, clave=None):
+    """Lecturas por nodo en cada banda del criterio (solo nodos con lecturas)."""
+    df_filtrado = agregar_clasificacion(df_filtrado.copy(deep=False), criterio, base=base, clave=clave)
+    tabla = pd.crosstab(df_filtrado["nodo"], df_filtrado["riesgo"], dropna=False)
+    return tabla.loc[tabla.sum(axis=1) > 0]
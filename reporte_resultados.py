@@ -0,0 +1,143 @@
+# --- REPORTES DIARIOS SIN INTERFAZ ---
+# Genera, para cada día de un rango, los mismos resultados que la sección de
+# Resultados de app.py (estadísticos por nodo, Leq horario, exposición,
+# lecturas por banda de riesgo y mapa de calor) sin importar Streamlit.
+# Los días se reparten entre procesos; matplotlib solo se importa si se
+# pide PNG o PDF.
+#
+# Uso:  python reporte_resultados.py 40nodos.csv --desde 2025-06-27 --hasta 2025-06-30 \
+#           --formatos csv png [--nodos 1 2 3] [--salida reportes] [--procesos 4]
+#       python reporte_resultados.py --almacen datos_parquet --desde ... --hasta ...
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from calidad_datos import calidad_para
+from carga_datos import cargar_resultados
+from clasificacion import CRITERIOS_RIESGO, RANGOS_DB, distribucion_horaria
+from mapa_calor import RESOLUCION_DEFAULT, construir_matriz
+from pipeline_resultados import (
+    calcular_estadisticos, riesgo_por_nodo, seleccionar, tabla_exposicion, ventana_local
+)
+
+FORMATOS = ("csv", "parquet", "png", "pdf")
+CRITERIO_DEFAULT = next(iter(CRITERIOS_RIESGO))
+
+
+def _lecturas_dia(fuente, almacen, fecha, nodos):
+    """(df_filtrado, base, clave) del día; `base` es None con el almacén Parquet."""
+    inicio, fin = ventana_local(fecha)
+    if almacen is not None:
+        from almacen_columnar import leer_almacen, nodos_disponibles
+
+        return leer_almacen(inicio, fin, nodos or nodos_disponibles(almacen), destino=almacen), None, None
+    # Cacheado por proceso: cada trabajador lee la fuente una sola vez
+    df, clave = cargar_resultados(fuente)
+    return seleccionar(df, inicio, fin, nodos, clave), df, clave
+
+
+def _guardar_tabla(tabla, ruta_base, formatos):
+    if "csv" in formatos:
+        tabla.to_csv(f"{ruta_base}.csv")
+    if "parquet" in formatos:
+        tabla = tabla.copy()
+        tabla.columns = tabla.columns.astype(str)
+        tabla.to_parquet(f"{ruta_base}.parquet")
+
+
+def _guardar_figura(matriz, ruta_base, formatos):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from mapa_calor import dibujar_matriz
+
+    fig = dibujar_matriz(matriz)
+    for formato in ("png", "pdf"):
+        if formato in formatos:
+            fig.savefig(f"{ruta_base}.{formato}", bbox_inches="tight")
+    plt.close(fig)
+
+
+def reporte_dia(fuente, fecha, salida, formatos, nodos=None, criterio=CRITERIO_DEFAULT, almacen=None):
+    """Escribe los archivos de un día en `salida/AAAA-MM-DD`; devuelve (fecha, filas)."""
+    df_filtrado, base, clave = _lecturas_dia(fuente, almacen, fecha, nodos)
+    if df_filtrado.empty:
+        return fecha, 0
+
+    directorio = os.path.join(salida, str(fecha))
+    os.makedirs(directorio, exist_ok=True)
+
+    # Disponibilidad e indicadores de calidad por nodo, ambos del día: los
+    # huecos y la primera/última lectura salen del archivo completo (un hueco
+    # puede empezar antes de medianoche) y el resto, de la selección
+    calidad_dia = calidad_para(df_filtrado)
+    calidad = calidad_para(base, clave) if base is not None else calidad_dia
+    nodos_dia = list(df_filtrado["nodo"].astype(str).unique())
+    _guardar_tabla(
+        pd.concat([calidad.disponibilidad(*ventana_local(fecha), nodos_dia), calidad_dia.resumen.loc[nodos_dia]], axis=1),
+        os.path.join(directorio, "calidad"), formatos,
+    )
+
+    resumen, leq_horario = calcular_estadisticos(df_filtrado, base=base, clave=clave)
+    _guardar_tabla(resumen, os.path.join(directorio, "estadisticos"), formatos)
+    _guardar_tabla(leq_horario, os.path.join(directorio, "leq_horario"), formatos)
+
+    distribucion = distribucion_horaria(df_filtrado, RANGOS_DB)
+    _guardar_tabla(tabla_exposicion(distribucion), os.path.join(directorio, "exposicion"), formatos)
+    _guardar_tabla(
+        riesgo_por_nodo(df_filtrado, CRITERIOS_RIESGO[criterio], base=base, clave=clave),
+        os.path.join(directorio, "riesgo_por_nodo"), formatos,
+    )
+
+    if "png" in formatos or "pdf" in formatos:
+        matriz = construir_matriz(df_filtrado, resolucion=RESOLUCION_DEFAULT, huecos=calidad.huecos)
+        if matriz is not None and min(matriz.valores.shape) > 1:
+            _guardar_figura(matriz, os.path.join(directorio, "mapa_calor"), formatos)
+    return fecha, len(df_filtrado)
+
+
+def generar_reportes(fuente, desde, hasta, salida="reportes", formatos=("csv",), nodos=None,
+                     criterio=CRITERIO_DEFAULT, almacen=None, procesos=None):
+    """Reportes de cada día entre `desde` y `hasta` (inclusive), en paralelo por día."""
+    fechas = [d.date() for d in pd.date_range(desde, hasta, freq="D")]
+    if almacen is None:
+        # Carga previa en el proceso principal: con fork, los trabajadores heredan la caché
+        cargar_resultados(fuente)
+
+    trabajadores = min(len(fechas), procesos or os.cpu_count() or 1)
+    argumentos = [(fuente, fecha, salida, formatos, nodos, criterio, almacen) for fecha in fechas]
+    if trabajadores <= 1:
+        return [reporte_dia(*a) for a in argumentos]
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        return list(pool.map(reporte_dia, *zip(*argumentos)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reportes diarios de niveles de sonido por nodo.")
+    parser.add_argument("fuente", nargs="?", default=os.environ.get("RUIDO_DATOS", "consultaprueba2.csv"),
+                        help="Archivo CSV, directorio o patrón glob con las exportaciones")
+    parser.add_argument("--almacen", help="Leer del almacén Parquet en lugar de los CSV")
+    parser.add_argument("--desde", required=True, help="Primer día (AAAA-MM-DD)")
+    parser.add_argument("--hasta", help="Último día (por defecto, el mismo que --desde)")
+    parser.add_argument("--nodos", nargs="+", help="Nodos a incluir (por defecto, todos)")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=["csv"])
+    parser.add_argument("--criterio", choices=list(CRITERIOS_RIESGO), default=CRITERIO_DEFAULT)
+    parser.add_argument("--salida", default="reportes")
+    parser.add_argument("--procesos", type=int)
+    args = parser.parse_args(argv)
+
+    resultados = generar_reportes(
+        args.fuente, args.desde, args.hasta or args.desde, salida=args.salida, formatos=args.formatos,
+        nodos=args.nodos, criterio=args.criterio, almacen=args.almacen, procesos=args.procesos,
+    )
+    for fecha, filas in resultados:
+        print(f"{fecha}: {filas} filas" if filas else f"{fecha}: sin datos")
+
+
+if __name__ == "__main__":
+    main()
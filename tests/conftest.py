@@ -0,0 +1,50 @@
+# --- FIXTURES COMUNES DE LAS PRUEBAS ---
+# Los módulos de la app están en la raíz del repositorio (sin paquete), así
+# que se agrega al path antes de importarlos.
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ANOTACIONES = (
+    "#group,false,false,true,true,false,false,true,true,true\n"
+    "#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string,string\n"
+    "#default,mean,,,,,,,,\n"
+    ",result,table,_start,_stop,_time,_value,_field,_measurement,nodo\n"
+)
+
+
+def csv_anotado(nodos=3, lecturas=20, periodo_s=60, inicio="2025-06-27T18:00:00Z"):
+    """Texto de una exportación anotada chica: una tabla por nodo, como 40nodos.csv."""
+    t0 = pd.Timestamp(inicio)
+    lineas = [ANOTACIONES.rstrip("\n")]
+    for tabla, nodo in enumerate(range(1, nodos + 1)):
+        for i in range(lecturas):
+            t = (t0 + pd.Timedelta(seconds=i * periodo_s)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            valor = 50 + nodo + (i % 7) * 1.5
+            lineas.append(f",,{tabla},{inicio},{t},{t},{valor},leq,leq,{nodo}")
+    return "\n".join(lineas) + "\n"
+
+
+@pytest.fixture
+def texto_anotado():
+    return csv_anotado()
+
+
+@pytest.fixture
+def lecturas():
+    """Lecturas normalizadas: 3 nodos, cada minuto durante 3 horas."""
+    from carga_datos import normalizar
+
+    tiempos = pd.date_range("2025-06-27 10:00", periods=180, freq="min", tz="America/Mexico_City")
+    rng = np.random.default_rng(0)
+    return normalizar(pd.DataFrame({
+        "_time": np.tile(tiempos, 3),
+        "nodo": np.repeat(["1", "2", "10"], len(tiempos)),
+        "_value": rng.uniform(40, 95, 3 * len(tiempos)),
+    }))
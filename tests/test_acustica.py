@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from acustica import RESOLUCION_DB, ParcialesAcusticos, leq, parciales_ventana
+
+
+def test_leq_es_promedio_energetico():
+    assert np.isclose(leq([60, 60]), 60)
+    assert np.isclose(leq([60, 70]), 10 * np.log10((1e6 + 1e7) / 2))
+
+
+def test_estadisticos_por_nodo(lecturas):
+    tabla = ParcialesAcusticos.desde_lecturas(lecturas).combinar(["nodo"]).estadisticos().set_index("nodo")
+    for nodo, grupo in lecturas.groupby("nodo", observed=True):
+        valores = grupo["_value"].to_numpy(dtype=np.float64)
+        fila = tabla.loc[nodo]
+        assert np.isclose(fila["Leq"], leq(valores))
+        assert np.isclose(fila["Lmax"], valores.max())
+        assert np.isclose(fila["Lmin"], valores.min())
+        assert fila["Conteo"] == len(valores)
+        # L10 es el nivel excedido el 10 % del tiempo (percentil 90), redondeado
+        # al centro de su intervalo del histograma
+        for nombre, percentil in (("L10", 90), ("L50", 50), ("L90", 10)):
+            exacto = np.percentile(valores, percentil, method="inverted_cdf")
+            assert abs(fila[nombre] - exacto) <= RESOLUCION_DB / 2 + 1e-9
+        assert fila["L90"] <= fila["L50"] <= fila["L10"]
+
+
+def test_parciales_ventana_reutiliza_horas_completas(lecturas):
+    base = ParcialesAcusticos.desde_lecturas(lecturas)
+    seleccion = lecturas[
+        (lecturas["_time"] >= pd.Timestamp("2025-06-27 10:17", tz="America/Mexico_City"))
+        & (lecturas["_time"] <= pd.Timestamp("2025-06-27 12:42", tz="America/Mexico_City"))
+        & (lecturas["nodo"] != "2")
+    ]
+
+    reutilizado = parciales_ventana(seleccion, base).combinar(["nodo"]).estadisticos()
+    directo = ParcialesAcusticos.desde_lecturas(seleccion).combinar(["nodo"]).estadisticos()
+    pd.testing.assert_frame_equal(reutilizado, directo, check_dtype=False, check_categorical=False)
+
+
+def test_combinar_por_hora(lecturas):
+    horario = ParcialesAcusticos.desde_lecturas(lecturas).combinar(["hora"]).estadisticos()
+    assert len(horario) == 3
+    assert horario["Conteo"].sum() == len(lecturas)
+
+
+def test_percentiles_dentro_de_lo_medido():
+    # 55.26 cae en el intervalo de 55.3 dB: L10 no debe pasar de Lmax
+    df = pd.DataFrame({
+        "_time": pd.date_range("2025-06-29 01:30", periods=4, freq="10min", tz="America/Mexico_City"),
+        "nodo": pd.Categorical(["1"] * 4),
+        "_value": np.array([54.0, 54.5, 55.0, 55.26], dtype=np.float32),
+    })
+    fila = ParcialesAcusticos.desde_lecturas(df).combinar(["nodo"]).estadisticos().iloc[0]
+    for nombre in ("L10", "L50", "L90"):
+        assert fila["Lmin"] <= fila[nombre] <= fila["Lmax"]
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from calidad_datos import evaluar_calidad
+from carga_datos import normalizar
+
+ZONA = "America/Mexico_City"
+
+
+def _lecturas(tiempos_por_nodo, valores=None):
+    filas = [(t, nodo) for nodo, tiempos in tiempos_por_nodo.items() for t in tiempos]
+    df = pd.DataFrame({
+        "_time": pd.to_datetime([t for t, _ in filas]).tz_localize(ZONA),
+        "nodo": [n for _, n in filas],
+        "_value": valores if valores is not None else np.full(len(filas), 60.0),
+    })
+    return normalizar(df)
+
+
+def _cada_minuto(desde, n):
+    return list(pd.date_range(desde, periods=n, freq="min"))
+
+
+def test_periodo_huecos_y_duplicados():
+    tiempos = _cada_minuto("2025-06-27 10:00", 30) + _cada_minuto("2025-06-27 11:00", 30)
+    tiempos.append(tiempos[5])  # marca de tiempo repetida
+    df = _lecturas({"1": tiempos, "2": _cada_minuto("2025-06-27 10:00", 90)})
+
+    calidad = evaluar_calidad(df)
+    uno, dos = calidad.resumen.loc["1"], calidad.resumen.loc["2"]
+    assert uno["Lecturas"] == 61 and dos["Lecturas"] == 90
+    assert uno["Periodo (s)"] == 60 and dos["Periodo (s)"] == 60
+    assert uno["Duplicados"] == 1 and dos["Duplicados"] == 0
+    assert uno["Huecos"] == 1 and dos["Huecos"] == 0
+    assert uno["Sin datos (min)"] == 31
+    assert dos["Jitter (s)"] == 0
+
+    (hueco,) = calidad.huecos.itertuples()
+    assert hueco.nodo == "1"
+    assert hueco.inicio == pd.Timestamp("2025-06-27 10:29", tz=ZONA)
+    assert hueco.fin == pd.Timestamp("2025-06-27 11:00", tz=ZONA)
+
+
+def test_fuera_de_rango_y_descartadas():
+    df = pd.DataFrame({
+        "_time": ["2025-06-27T16:00:00Z", "2025-06-27T16:01:00Z", "2025-06-27T16:02:00Z", "no es fecha"],
+        "nodo": ["1", "1", "1", "1"],
+        "_value": [10.0, 60.0, 150.0, 60.0],
+    })
+    calidad = evaluar_calidad(normalizar(df))
+    assert calidad.resumen.loc["1", "Fuera de rango"] == 2
+    assert calidad.descartadas == 1
+
+
+def test_disponibilidad_descuenta_huecos():
+    tiempos = _cada_minuto("2025-06-27 10:00", 31) + _cada_minuto("2025-06-27 11:00", 61)
+    calidad = evaluar_calidad(_lecturas({"1": tiempos, "2": _cada_minuto("2025-06-27 10:00", 121)}))
+
+    inicio = pd.Timestamp("2025-06-27 10:00", tz=ZONA)
+    fin = pd.Timestamp("2025-06-27 12:00", tz=ZONA)
+    disponibilidad = calidad.disponibilidad(inicio, fin, ["1", "2", "3"])
+    assert disponibilidad["2"] == 100.0
+    assert disponibilidad["1"] == 75.0
+    assert disponibilidad["3"] == 0.0
+
+    assert len(calidad.huecos_en(inicio, fin)) == 1
+    assert calidad.huecos_en(inicio, fin, ["2"]).empty
+    assert calidad.huecos_en(fin, fin + pd.Timedelta(hours=1)).empty
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from clasificacion import (
+    NADF_005_AMBT_2013, RANGOS_DB, RIESGO_AUDITIVO, TablaBandas, agregar_clasificacion,
+    distribucion_horaria,
+)
+
+
+def test_tabla_bandas_valida_limites():
+    with pytest.raises(ValueError):
+        TablaBandas((85, 100), ("a", "b"))
+    with pytest.raises(ValueError):
+        TablaBandas((100, 85), ("a", "b", "c"))
+
+
+def test_bandas_cerradas_por_abajo():
+    df = pd.DataFrame({"_value": [84.9, 85.0, 99.9, 100.0]})
+    assert list(RIESGO_AUDITIVO.clasificar(df)) == [
+        "Seguro", "Riesgo moderado", "Riesgo moderado", "Peligroso"
+    ]
+
+
+def test_bandas_diurnas_y_nocturnas():
+    df = pd.DataFrame({
+        "_time": pd.to_datetime(["2025-06-27 05:59", "2025-06-27 06:00", "2025-06-27 20:00"])
+        .tz_localize("America/Mexico_City"),
+        "_value": [63.0, 63.0, 63.0],
+    })
+    assert list(NADF_005_AMBT_2013.clasificar(df)) == [
+        "Excede límite", "Dentro del límite", "Excede límite"
+    ]
+
+
+def test_clasificacion_cacheada_igual_que_directa(lecturas):
+    seleccion = lecturas.iloc[100:400]
+    directa = agregar_clasificacion(seleccion.copy(deep=False))
+    cacheada = agregar_clasificacion(
+        seleccion.copy(deep=False), base=lecturas, clave=("prueba-clasificacion", 1)
+    )
+    pd.testing.assert_frame_equal(directa, cacheada)
+
+
+def test_distribucion_horaria(lecturas):
+    distribucion = distribucion_horaria(lecturas, RANGOS_DB)
+    assert distribucion.conteos.sum() == len(lecturas)
+    assert distribucion.horas == [10, 11, 12]
+    assert distribucion.nodos == ["1", "2", "10"]
+    # Cada lectura cuenta un minuto (el periodo de muestreo)
+    assert np.allclose(distribucion.segundos.sum(axis=(0, 1)), 180 * 60)
+    porcentajes = distribucion.porcentajes_por_hora()
+    assert np.allclose(porcentajes.sum(axis=1), 100)
+
+    minutos = distribucion.minutos_desde(85)
+    for nodo, grupo in lecturas.groupby("nodo", observed=True):
+        assert minutos[nodo] == (grupo["_value"] >= 85).sum()
@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+
+import fuente_influx
+from cache_lru import espacio_cache
+from conftest import csv_anotado
+from fuente_influx import (
+    REFRESCO_S, ConfigInflux, ConsultaGrabada, consultar_nodos, consultar_resultados,
+    ventana_para_ancho, version_influx,
+)
+
+CONFIG = ConfigInflux(url="http://localhost:8086", token="t", org="uam", bucket="ruido")
+INICIO = pd.Timestamp("2025-06-27 12:00", tz="America/Mexico_City")
+FIN = pd.Timestamp("2025-06-27 13:00", tz="America/Mexico_City")
+
+NODOS_CSV = (
+    "#group,false,false,false\n"
+    "#datatype,string,long,string\n"
+    "#default,_result,,\n"
+    ",result,table,_value\n"
+    ",,0,10\n"
+    ",,0,2\n"
+    ",,0,1\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    espacio_cache("influx").limpiar()
+    yield
+    espacio_cache("influx").limpiar()
+
+
+def test_consulta_flux_y_resultado_normalizado():
+    api = ConsultaGrabada(csv_anotado(nodos=2))
+    df = consultar_resultados(CONFIG, INICIO, FIN, [2, "1"], ancho_px=100, query_api=api)
+
+    (flux,) = api.consultas
+    assert 'from(bucket: "ruido")' in flux
+    assert "range(start: 2025-06-27T18:00:00Z, stop: 2025-06-27T19:00:00Z)" in flux
+    assert 'contains(value: r.nodo, set: ["1", "2"])' in flux
+    assert f"aggregateWindow(every: {ventana_para_ancho(INICIO, FIN, 100)}s, fn: mean" in flux
+
+    assert len(df) == 40
+    assert str(df["_time"].dt.tz) == "America/Mexico_City"
+    assert list(df["nodo"].cat.categories) == ["1", "2"]
+
+
+def test_ventana_para_ancho():
+    assert ventana_para_ancho(INICIO, FIN, 1000) == 5
+    assert ventana_para_ancho(INICIO, FIN, 60) == 60
+    assert ventana_para_ancho(INICIO, INICIO + pd.Timedelta(days=3650), 10) == 86400
+
+
+def test_cache_por_rango_nodos_y_ventana():
+    api = ConsultaGrabada(csv_anotado(nodos=2))
+    primero = consultar_resultados(CONFIG, INICIO, FIN, ["1", "2"], query_api=api)
+    # El orden de los nodos no cambia la clave
+    assert consultar_resultados(CONFIG, INICIO, FIN, ["2", "1"], query_api=api) is primero
+    assert len(api.consultas) == 1
+
+    consultar_resultados(CONFIG, INICIO, FIN, ["1"], query_api=api)
+    consultar_resultados(CONFIG, INICIO, FIN + pd.Timedelta(hours=1), ["1", "2"], query_api=api)
+    assert len(api.consultas) == 3
+
+
+def test_version_influx_solo_caduca_si_llega_al_presente():
+    ahora = pd.Timestamp("2025-06-28 12:00", tz="UTC")
+    despues = ahora + pd.Timedelta(seconds=REFRESCO_S)
+
+    pasada = ahora - pd.Timedelta(days=1)
+    assert version_influx(CONFIG, pasada, ahora) == ("influx", CONFIG.url, CONFIG.bucket)
+    assert version_influx(CONFIG, pasada, despues) == version_influx(CONFIG, pasada, ahora)
+
+    presente = ahora + pd.Timedelta(hours=2)
+    assert version_influx(CONFIG, presente, ahora)[:3] == ("influx", CONFIG.url, CONFIG.bucket)
+    assert version_influx(CONFIG, presente, despues) != version_influx(CONFIG, presente, ahora)
+
+
+def test_ventana_hasta_el_presente_se_vuelve_a_consultar(monkeypatch):
+    reloj = [pd.Timestamp.now(tz="UTC")]
+    original = fuente_influx.version_influx
+    monkeypatch.setattr(fuente_influx, "version_influx", lambda config, fin: original(config, fin, reloj[0]))
+
+    api = ConsultaGrabada(csv_anotado(nodos=1))
+    fin = reloj[0] + pd.Timedelta(hours=1)
+    inicio = fin - pd.Timedelta(hours=3)
+    consultar_resultados(CONFIG, inicio, fin, ["1"], query_api=api)
+    consultar_resultados(CONFIG, inicio, fin, ["1"], query_api=api)
+    assert len(api.consultas) == 1
+
+    reloj[0] += pd.Timedelta(seconds=REFRESCO_S)
+    consultar_resultados(CONFIG, inicio, fin, ["1"], query_api=api)
+    assert len(api.consultas) == 2
+
+
+def test_consultar_nodos_ordena_y_cachea():
+    api = ConsultaGrabada(NODOS_CSV)
+    assert consultar_nodos(CONFIG, query_api=api) == ["1", "2", "10"]
+    assert consultar_nodos(CONFIG, query_api=api) == ["1", "2", "10"]
+    assert len(api.consultas) == 1
+    assert 'schema.tagValues(bucket: "ruido", tag: "nodo"' in api.consultas[0]
+
+
+def test_consulta_grabada_desde_archivo(tmp_path):
+    ruta = tmp_path / "respuesta.csv"
+    ruta.write_text(csv_anotado(nodos=1), encoding="utf-8")
+    api = ConsultaGrabada(lambda flux: str(ruta))
+    assert len(consultar_resultados(CONFIG, INICIO, FIN, ["1"], query_api=api)) == 20
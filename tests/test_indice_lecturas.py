@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from indice_lecturas import IndiceLecturas, indice_para
+
+
+def _con_mascara(df, inicio, fin, nodos):
+    mascara = (df["_time"] >= inicio) & (df["_time"] <= fin) & df["nodo"].astype(str).isin(nodos)
+    return df[mascara]
+
+
+@pytest.mark.parametrize("nodos", [["1"], ["1", "2"], ["1", "10"], ["10", "1"], ["2", "99"]])
+def test_ventana_igual_que_mascara(lecturas, nodos):
+    inicio = pd.Timestamp("2025-06-27 10:30", tz="America/Mexico_City")
+    fin = pd.Timestamp("2025-06-27 11:45", tz="America/Mexico_City")
+    indice = IndiceLecturas(lecturas)
+
+    ventana = indice.ventana(lecturas, inicio, fin, nodos)
+
+    esperado = _con_mascara(lecturas, inicio, fin, nodos)
+    pd.testing.assert_frame_equal(ventana.sort_index(), esperado)
+
+
+def test_extremos_inclusivos_y_otra_zona(lecturas):
+    indice = IndiceLecturas(lecturas)
+    inicio = pd.Timestamp("2025-06-27 16:00", tz="UTC")  # 10:00 en México
+    ventana = indice.ventana(lecturas, inicio, inicio, ["2"])
+    assert len(ventana) == 1
+    assert ventana["_time"].iloc[0] == inicio
+
+
+def test_sin_resultados(lecturas):
+    indice = IndiceLecturas(lecturas)
+    fuera = pd.Timestamp("2030-01-01", tz="America/Mexico_City")
+    vacio = indice.ventana(lecturas, fuera, fuera + pd.Timedelta(hours=1), indice.nodos)
+    assert vacio.empty
+    assert list(vacio.columns) == list(lecturas.columns)
+
+
+def test_nodos_y_fechas(lecturas):
+    indice = IndiceLecturas(lecturas)
+    assert indice.nodos == ["1", "2", "10"]
+    assert indice.fecha_min == indice.fecha_max == pd.Timestamp("2025-06-27").date()
+
+
+def test_indice_para_solo_cachea_con_clave(lecturas):
+    assert indice_para(lecturas) is not indice_para(lecturas)
+    clave = ("prueba-indice", 1)
+    assert indice_para(lecturas, clave) is indice_para(lecturas, clave)
@@ -0,0 +1,73 @@
+import io
+
+import pandas as pd
+import pytest
+
+from conftest import csv_anotado
+from influx_csv import leer_csv_anotado
+
+
+def _comparable(df):
+    return df.astype({"nodo": str}).reset_index(drop=True)
+
+
+def test_tipos_y_columnas(texto_anotado):
+    df = leer_csv_anotado(texto_anotado)
+    assert list(df.columns) == ["_time", "nodo", "_value"]
+    assert len(df) == 60
+    assert str(df["_time"].dtype) == "datetime64[ns, UTC]"
+    assert df["_value"].dtype == "float64"
+    assert df["nodo"].astype(str).unique().tolist() == ["1", "2", "3"]
+
+
+@pytest.mark.parametrize("como_bytes", [False, True])
+@pytest.mark.parametrize("tamano", [97, 4099, 1 << 20])
+def test_crlf_varias_tablas_y_trozos(texto_anotado, como_bytes, tamano):
+    # Dos tablas anotadas separadas por una línea vacía, con finales \r\n,
+    # como llegan de query_raw o de la cola del CSV en vivo
+    referencia = leer_csv_anotado(texto_anotado)
+    doble = (texto_anotado.rstrip("\n") + "\n\n" + texto_anotado).replace("\n", "\r\n")
+    fuente = doble.encode("utf-8") if como_bytes else doble
+
+    leido = leer_csv_anotado(fuente, tamano_trozo=tamano)
+
+    esperado = pd.concat([referencia, referencia], ignore_index=True)
+    pd.testing.assert_frame_equal(_comparable(leido), _comparable(esperado), check_dtype=False)
+
+
+def test_bom_y_archivo_binario(texto_anotado):
+    leido = leer_csv_anotado(io.BytesIO(("\ufeff" + texto_anotado).encode("utf-8")), tamano_trozo=50)
+    pd.testing.assert_frame_equal(_comparable(leido), _comparable(leer_csv_anotado(texto_anotado)))
+
+
+def test_desde_ruta(tmp_path, texto_anotado):
+    ruta = tmp_path / "exportacion.csv"
+    ruta.write_text(texto_anotado, encoding="utf-8")
+    assert len(leer_csv_anotado(str(ruta))) == 60
+
+
+def test_solo_anotaciones_da_vacio():
+    df = leer_csv_anotado(csv_anotado(nodos=0))
+    assert df.empty
+    assert list(df.columns) == ["_time", "nodo", "_value"]
+
+
+def test_solo_columnas_pedidas(texto_anotado):
+    df = leer_csv_anotado(texto_anotado, columnas=("_value", "_field"))
+    assert list(df.columns) == ["_value", "_field"]
+    assert set(df["_field"].astype(str)) == {"leq"}
+
+
+def test_tablas_con_esquema_distinto():
+    # Una segunda tabla con otra columna extra y otro orden
+    segunda = (
+        "#group,false,false,true,false,false\n"
+        "#datatype,string,long,string,double,dateTime:RFC3339\n"
+        "#default,mean,,,,\n"
+        ",result,table,nodo,_value,_time\n"
+        ",,0,7,61.5,2025-06-27T19:00:00Z\n"
+    )
+    df = leer_csv_anotado(csv_anotado(nodos=1, lecturas=2) + "\n" + segunda, tamano_trozo=64)
+    assert df["nodo"].astype(str).tolist() == ["1", "1", "7"]
+    assert df["_value"].iloc[-1] == 61.5
+    assert df["_time"].iloc[-1] == pd.Timestamp("2025-06-27T19:00:00Z")
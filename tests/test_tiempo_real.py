@@ -0,0 +1,36 @@
+from carga_datos import normalizar
+from conftest import csv_anotado
+from tiempo_real import SeguidorCSV
+
+
+def _lineas_de_datos(texto):
+    return [l for l in texto.splitlines() if l and not l.startswith("#") and not l.startswith(",result")]
+
+
+def test_solo_lineas_completas(tmp_path):
+    ruta = tmp_path / "vivo.csv"
+    ruta.write_text("_time,nodo,_value\n2025-06-27T16:00:00Z,1,50\n2025-06-27T16:01", encoding="utf-8")
+    seguidor = SeguidorCSV(str(ruta))
+    assert len(seguidor.leer_nuevas()) == 1
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(":00Z,1,51\n")
+    assert normalizar(seguidor.leer_nuevas())["_value"].tolist() == [51.0]
+    assert seguidor.leer_nuevas() is None
+
+
+def test_filas_antes_de_una_tabla_anotada_nueva(tmp_path):
+    texto = csv_anotado(nodos=2, lecturas=50)
+    encabezado = texto.splitlines()[:4]
+    datos = _lineas_de_datos(texto)
+    ruta = tmp_path / "vivo.csv"
+    ruta.write_text("\n".join(encabezado + datos[:30]) + "\n", encoding="utf-8")
+
+    seguidor = SeguidorCSV(str(ruta))
+    leidas = len(seguidor.leer_nuevas())
+    # Un mismo bloque con más filas de la tabla en curso y luego una tabla nueva
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write("\n".join(datos[30:60]) + "\n\n" + "\n".join(encabezado + datos[60:]) + "\n")
+    nuevas = seguidor.leer_nuevas()
+
+    assert leidas + len(nuevas) == len(datos)
+    assert len(normalizar(nuevas)) == len(nuevas)
@@ -0,0 +1,241 @@
+# --- MONITOREO EN TIEMPO REAL ---
+# Cada nodo guarda sus lecturas recientes en un buffer circular de tamaño fijo.
+# En cada tick de streamlit-autorefresh solo se leen las filas posteriores al
+# último `_time` visto (la cola de un CSV que crece, o una consulta
+# incremental a InfluxDB), de modo que el costo por tick es O(filas nuevas).
+# Los monitores viven a nivel de módulo y los comparten todas las sesiones.
+
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from carga_datos import ZONA_HORARIA, normalizar
+from influx_csv import COLUMNAS_UTILES, leer_csv_anotado, normalizar_nombre
+
+# Lecturas recientes que se conservan por nodo
+CAPACIDAD_POR_NODO = int(os.environ.get("RUIDO_BUFFER_VIVO", "2000"))
+
+# Historia que se pide a InfluxDB al arrancar un monitor
+VENTANA_INICIAL = pd.Timedelta(hours=1)
+
+_monitores = {}
+_monitores_lock = threading.Lock()
+
+
+class BufferCircular:
+    """Últimas `capacidad` lecturas (tiempo en ns UTC, valor en dB) de un nodo."""
+
+    def __init__(self, capacidad=CAPACIDAD_POR_NODO):
+        self.capacidad = int(capacidad)
+        self.tiempos = np.zeros(self.capacidad, dtype=np.int64)
+        self.valores = np.zeros(self.capacidad, dtype=np.float32)
+        self.inicio = 0
+        self.n = 0
+
+    def agregar(self, tiempos, valores):
+        k = len(tiempos)
+        if k == 0:
+            return
+        if k >= self.capacidad:
+            self.tiempos[:] = tiempos[-self.capacidad:]
+            self.valores[:] = valores[-self.capacidad:]
+            self.inicio, self.n = 0, self.capacidad
+            return
+        pos = (self.inicio + self.n + np.arange(k)) % self.capacidad
+        self.tiempos[pos] = tiempos
+        self.valores[pos] = valores
+        desborde = max(self.n + k - self.capacidad, 0)
+        self.inicio = (self.inicio + desborde) % self.capacidad
+        self.n = min(self.n + k, self.capacidad)
+
+    def ultimo(self):
+        return self.tiempos[(self.inicio + self.n - 1) % self.capacidad]
+
+    def ordenados(self):
+        idx = (self.inicio + np.arange(self.n)) % self.capacidad
+        return self.tiempos[idx], self.valores[idx]
+
+
+class BufferEnVivo:
+    """Un `BufferCircular` por nodo más el último `_time` ingerido."""
+
+    def __init__(self, capacidad=CAPACIDAD_POR_NODO):
+        self.capacidad = capacidad
+        self.nodos = {}
+        self.ultimo_ns = None
+
+    def agregar(self, df):
+        """Agrega un DataFrame normalizado; descarta lo ya visto. Devuelve filas nuevas."""
+        if df.empty:
+            return 0
+        tiempos = df["_time"].dt.tz_convert("UTC").dt.as_unit("ns").array.asi8
+        orden = np.argsort(tiempos, kind="stable")
+        tiempos = tiempos[orden]
+        valores = df["_value"].to_numpy(dtype=np.float32)[orden]
+        nodos = np.asarray(df["nodo"].astype(str))[orden]
+        agregadas = 0
+        for nodo in np.unique(nodos):
+            sel = nodos == nodo
+            buffer = self.nodos.get(nodo)
+            if buffer is None:
+                buffer = self.nodos[nodo] = BufferCircular(self.capacidad)
+            t_nodo, v_nodo = tiempos[sel], valores[sel]
+            if buffer.n:
+                # Solo lo posterior a la última lectura de este nodo
+                nuevos = t_nodo > buffer.ultimo()
+                t_nodo, v_nodo = t_nodo[nuevos], v_nodo[nuevos]
+            buffer.agregar(t_nodo, v_nodo)
+            agregadas += len(t_nodo)
+        if self.ultimo_ns is None or tiempos[-1] > self.ultimo_ns:
+            self.ultimo_ns = int(tiempos[-1])
+        return agregadas
+
+    def lista_nodos(self):
+        try:
+            return sorted(self.nodos, key=int)
+        except ValueError:
+            return sorted(self.nodos)
+
+    def dataframe(self, nodos=None):
+        """Lecturas en buffer con el mismo esquema que `cargar_resultados`."""
+        nodos = self.lista_nodos() if nodos is None else [n for n in nodos if n in self.nodos]
+        partes = [self.nodos[n].ordenados() for n in nodos]
+        tiempos = np.concatenate([p[0] for p in partes]) if partes else np.array([], dtype=np.int64)
+        valores = np.concatenate([p[1] for p in partes]) if partes else np.array([], dtype=np.float32)
+        etiquetas = np.repeat(np.arange(len(nodos)), [len(p[0]) for p in partes])
+        return pd.DataFrame({
+            "_time": pd.to_datetime(tiempos, utc=True).tz_convert(ZONA_HORARIA),
+            "nodo": pd.Categorical.from_codes(etiquetas, categories=nodos),
+            "_value": valores,
+        })
+
+
+class SeguidorCSV:
+    """Lee solo las líneas completas añadidas a un CSV desde la última lectura."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.posicion = 0
+        self.nombres = None
+
+    def _reiniciar(self):
+        self.posicion = 0
+        self.nombres = None
+
+    def leer_nuevas(self):
+        tamano = os.path.getsize(self.ruta)
+        if tamano < self.posicion:
+            # El archivo se truncó o se rotó: empezar de nuevo
+            self._reiniciar()
+        if tamano == self.posicion:
+            return None
+        with open(self.ruta, "rb") as f:
+            f.seek(self.posicion)
+            bloque = f.read(tamano - self.posicion)
+        corte = bloque.rfind(b"\n")
+        if corte == -1:
+            return None
+        bloque = bloque[:corte + 1]
+        self.posicion += corte + 1
+        texto = bloque.decode("utf-8-sig")
+
+        # Las anotaciones marcan el inicio del archivo o de una tabla nueva;
+        # las líneas anteriores a ellas son datos de la tabla en curso
+        if texto.startswith("#"):
+            previo, anotado = "", texto
+        else:
+            corte = texto.find("\n#")
+            previo, anotado = (texto, "") if corte == -1 else (texto[:corte + 1], texto[corte + 1:])
+
+        partes = []
+        if previo:
+            partes.append(self._leer_plano(previo))
+        if anotado:
+            self.nombres = self._ultimo_encabezado(anotado)
+            partes.append(leer_csv_anotado(anotado))
+        partes = [p for p in partes if p is not None and not p.empty]
+        if not partes:
+            return None
+        if len(partes) == 1:
+            return partes[0]
+        # Las filas planas traen `_time` como texto; las anotadas, ya tipado
+        partes[0]["_time"] = pd.to_datetime(partes[0]["_time"], errors="coerce", utc=True, format="ISO8601")
+        return pd.concat(partes, ignore_index=True)
+
+    def _leer_plano(self, texto):
+        if self.nombres is None:
+            # CSV plano: la primera línea es el encabezado
+            primera = texto.split("\n", 1)[0].rstrip("\r").split(",")
+            self.nombres = [normalizar_nombre(c) for c in primera]
+            texto = texto.split("\n", 1)[1] if "\n" in texto else ""
+        if not texto.strip():
+            return None
+        return pd.read_csv(
+            io.StringIO(texto),
+            header=None,
+            names=self.nombres,
+            usecols=list(COLUMNAS_UTILES),
+            dtype={"nodo": str},
+        )
+
+    @staticmethod
+    def _ultimo_encabezado(texto):
+        encabezado, previa_anotada = None, False
+        for linea in texto.split("\n"):
+            if linea.startswith("#"):
+                previa_anotada = True
+            elif previa_anotada and linea.strip():
+                encabezado = [normalizar_nombre(c) for c in linea.rstrip("\r").split(",")]
+                previa_anotada = False
+        return encabezado
+
+
+class Monitor:
+    """Une una fuente incremental con un `BufferEnVivo`."""
+
+    def __init__(self, leer_nuevas, capacidad=CAPACIDAD_POR_NODO):
+        self._leer_nuevas = leer_nuevas
+        self.buffer = BufferEnVivo(capacidad)
+        self._lock = threading.Lock()
+
+    def actualizar(self):
+        with self._lock:
+            crudo = self._leer_nuevas(self.buffer.ultimo_ns)
+            if crudo is None or crudo.empty:
+                return 0
+            return self.buffer.agregar(normalizar(crudo))
+
+    def dataframe(self, nodos=None):
+        with self._lock:
+            return self.buffer.dataframe(nodos)
+
+
+def monitor_csv(ruta):
+    """Monitor compartido para la cola de un CSV."""
+    seguidor = SeguidorCSV(ruta)
+    return _obtener_monitor(("csv", os.path.abspath(ruta)), lambda: Monitor(lambda _: seguidor.leer_nuevas()))
+
+
+def monitor_influx(config, query_api=None):
+    """Monitor compartido que pide a InfluxDB solo lo posterior al último `_time`."""
+    from fuente_influx import consultar_nuevos
+
+    def leer_nuevas(ultimo_ns):
+        if ultimo_ns is None:
+            desde = pd.Timestamp.now(tz="UTC") - VENTANA_INICIAL
+        else:
+            desde = pd.Timestamp(ultimo_ns, tz="UTC")
+        return consultar_nuevos(config, desde, query_api=query_api)
+
+    return _obtener_monitor(("influx", config.url, config.bucket), lambda: Monitor(leer_nuevas))
+
+
+def _obtener_monitor(clave, crear):
+    with _monitores_lock:
+        monitor = _monitores.get(clave)
+        if monitor is None:
+            monitor = _monitores[clave] = crear()
+        return monitor